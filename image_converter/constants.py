@@ -1,5 +1,5 @@
 """Constants and configuration for the Image Format Converter."""
-from typing import Dict, List, Final
+from typing import Dict, List, Final, Tuple
 
 # Color scheme
 COLORS: Final[Dict[str, str]] = {
@@ -30,9 +30,9 @@ FORMATS: Final[Dict[str, List[str]]] = {
 # Window configuration
 WINDOW_DEFAULTS: Final[Dict[str, int]] = {
     "min_width": 350,
-    "min_height": 540,
+    "min_height": 700,
     "default_width": 400,
-    "default_height": 600,
+    "default_height": 800,
 }
 
 # Quality settings
@@ -40,6 +40,53 @@ DEFAULT_QUALITY: Final[int] = 85
 MIN_QUALITY: Final[int] = 1
 MAX_QUALITY: Final[int] = 100
 
+# Auto quality settings
+DEFAULT_AUTO_QUALITY_TARGET: Final[float] = 0.95  # Minimum SSIM of every sampled tile at full resolution
+AUTO_QUALITY_TILE_SIZE: Final[int] = 256  # Side of the native-resolution tiles encoded during the search
+AUTO_QUALITY_TILE_COUNT: Final[int] = 9  # Most detailed tiles encoded during the search
+AUTO_QUALITY_TILE_ALIGN: Final[int] = 16  # Tiles start on the codec block grid of the full image
+METRIC_MAX_SIZE: Final[int] = 512  # Longest side of the luma plane used for metrics
+SSIM_WINDOW: Final[int] = 7  # Side length of the SSIM averaging window
+
+# Resize settings
+RESIZE_MODES: Final[List[str]] = ["Original size", "Max dimension", "Scale %"]
+DEFAULT_MAX_DIMENSION: Final[int] = 2048
+DEFAULT_RESIZE_SCALE: Final[int] = 50  # Percent
+RESIZE_REDUCING_GAP: Final[int] = 2  # reduce() leaves at least this factor for the final filter
+
+# Palette quantization settings
+QUANTIZE_SAMPLE_SIZE: Final[int] = 256  # Longest side of the image the palette is built from
+KMEANS_SAMPLE_PIXELS: Final[int] = 16384  # Pixels sampled for k-means
+KMEANS_ITERATIONS: Final[int] = 8
+PALETTE_CACHE_SIZE: Final[int] = 8  # Palettes kept per cache
+
+# Conversion queue settings
+QUEUE_JOBS_PER_WORKER: Final[int] = 4  # Jobs kept in flight per worker thread
+QUEUE_VIEW_ROWS: Final[int] = 14  # Rows shown by the queue view
+QUEUE_REFRESH_MS: Final[int] = 250  # Queue view refresh interval while converting
+
+# PNG optimizer settings
+DEFAULT_PNG_OPTIMIZE_BUDGET: Final[int] = 5  # Seconds after which no new combinations are tried
+PNG_ZLIB_LEVELS: Final[Tuple[int, ...]] = (6, 9)  # zlib levels tried by the PNG optimizer, cheapest first
+PNG_COMPRESS_CHUNK_BYTES: Final[int] = 1 << 18  # Filtered bytes fed to zlib between deadline checks
+PNG_FILTER_BAND_BYTES: Final[int] = 1 << 20  # Scanline bytes filtered at a time
+ESTIMATE_POLL_MS: Final[int] = 100  # Poll interval of the background size estimate
+
+# Preview settings
+PREVIEW_TILE_SIZE: Final[int] = 256  # Side length of a preview tile
+PREVIEW_TILE_CACHE_SIZE: Final[int] = 192  # Tiles kept in memory
+PREVIEW_OVERVIEW_SIZE: Final[int] = 1024  # Longest side of the overview used for low-res passes
+PREVIEW_BLOCK_ALIGN: Final[int] = 16  # Compared regions are aligned to the codec block grid
+PREVIEW_COMPARE_MAX_PIXELS: Final[int] = 4_000_000  # Largest region encoded for comparison
+PREVIEW_MAX_ZOOM: Final[float] = 16.0  # Screen pixels per image pixel at the closest zoom
+PREVIEW_ZOOM_STEP: Final[float] = 1.25  # Zoom factor per mouse wheel notch
+PREVIEW_REFINE_DELAY_MS: Final[int] = 15  # Delay before the full-quality pass replaces the low-res one
+PREVIEW_COMPARE_DELAY_MS: Final[int] = 200  # Pause in panning or zooming before the comparison is encoded
+
+# Probe index settings
+PROBE_INDEX_FILENAME: Final[str] = "probe_index.sqlite3"
+PROBE_HASH_CHUNK_SIZE: Final[int] = 1024 * 1024  # Bytes read per hash update
+
 # Application info for config directory
 COMPANY_NAME: Final[str] = "ImageFormatConverter"
 APP_NAME: Final[str] = "ImageFormatConverter"
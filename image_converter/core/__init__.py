@@ -0,0 +1,77 @@
+"""Image processing core shared by the GUI and the batch API."""
+from .encoders import (
+    ENCODER_OPTIONS,
+    EncoderOption,
+    get_default_settings,
+    get_encoder_options,
+    get_save_kwargs,
+    normalize_settings,
+    settings_key,
+    supports_option
+)
+from .quantize import PaletteCache, build_palette, quantize_image, to_palette_image
+from .converter import encode_image, prepare_image, render_image, uses_palette
+from .metrics import luma_array, ssim
+from .quality import AutoQualityResult, find_auto_quality
+from .resize import ResizeOptions, draft_for_resize, resize_image
+from .metadata import MetadataOptions, get_metadata_kwargs, get_orientation
+from .probe import (
+    ImageInfo,
+    ProbeIndex,
+    get_default_index_path,
+    read_image_info,
+    scan_directory
+)
+from .batch import (
+    ConversionResult,
+    convert_batch,
+    convert_file,
+    get_output_path,
+    list_batch
+)
+from .queue import ConversionQueue, QueueEntry
+from .preview import TilePyramid, encode_region, visible_region
+
+__all__ = [
+    'ENCODER_OPTIONS',
+    'EncoderOption',
+    'get_default_settings',
+    'get_encoder_options',
+    'get_save_kwargs',
+    'normalize_settings',
+    'settings_key',
+    'supports_option',
+    'PaletteCache',
+    'build_palette',
+    'quantize_image',
+    'to_palette_image',
+    'encode_image',
+    'prepare_image',
+    'render_image',
+    'uses_palette',
+    'luma_array',
+    'ssim',
+    'AutoQualityResult',
+    'find_auto_quality',
+    'ResizeOptions',
+    'draft_for_resize',
+    'resize_image',
+    'MetadataOptions',
+    'get_metadata_kwargs',
+    'get_orientation',
+    'ImageInfo',
+    'ProbeIndex',
+    'get_default_index_path',
+    'read_image_info',
+    'scan_directory',
+    'ConversionResult',
+    'convert_batch',
+    'convert_file',
+    'get_output_path',
+    'list_batch',
+    'ConversionQueue',
+    'QueueEntry',
+    'TilePyramid',
+    'encode_region',
+    'visible_region'
+]
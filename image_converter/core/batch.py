@@ -0,0 +1,193 @@
+"""Batch conversion API for converting many files without the GUI."""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Mapping, Optional
+
+from PIL import Image
+
+from ..constants import DEFAULT_AUTO_QUALITY_TARGET, FORMATS
+from .converter import encode_image, render_image
+from .encoders import normalize_settings, supports_option
+from .metadata import MetadataOptions, get_metadata_kwargs
+from .probe import ImageInfo, read_image_info
+from .quality import find_auto_quality
+from .resize import ResizeOptions, draft_for_resize
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of converting a single file.
+    
+    Attributes:
+        source_path: Path of the input file
+        output_path: Path of the written file
+        format_name: Target format name
+        quality: Quality used, or ``None`` for formats without quality
+        settings: Complete encoder settings used
+        score: SSIM reached when auto quality chose the quality
+        size_bytes: Size of the written file
+        width: Source width in pixels
+        height: Source height in pixels
+        elapsed: Time spent converting, in seconds
+        bytes_saved: Bytes saved by the PNG optimizer, if it ran
+        error: Error message if the conversion failed
+    """
+    source_path: str
+    output_path: str
+    format_name: str
+    quality: Optional[int] = None
+    settings: Optional[Mapping[str, Any]] = None
+    score: Optional[float] = None
+    size_bytes: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    elapsed: Optional[float] = None
+    bytes_saved: Optional[int] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the file was converted successfully."""
+        return self.error is None
+
+
+def get_output_path(source_path: str, output_dir: str, format_name: str) -> str:
+    """Build the output path for a file, using the same naming as the GUI.
+    
+    Args:
+        source_path: Path of the input file
+        output_dir: Directory the converted file is written to
+        format_name: Target format name
+    
+    Returns:
+        The output file path.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(output_dir, f"{stem} {format_name}{FORMATS[format_name][0]}")
+
+
+def convert_file(
+    source_path: str,
+    output_path: str,
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None,
+    auto_quality: bool = False,
+    target: float = DEFAULT_AUTO_QUALITY_TARGET,
+    resize: Optional[ResizeOptions] = None,
+    metadata: Optional[MetadataOptions] = None
+) -> ConversionResult:
+    """Convert one file, recording any error in the result instead of raising.
+    
+    No image data is kept once the function returns.
+    
+    Args:
+        source_path: Path of the input file
+        output_path: Path of the output file
+        format_name: Target format name
+        settings: Encoder option values, missing ones use the defaults
+        auto_quality: Pick the lowest quality reaching ``target`` instead
+        target: SSIM target used by auto quality
+        resize: Optional resize applied before encoding
+        metadata: Metadata options, ``None`` for the defaults
+    
+    Returns:
+        The conversion result.
+    """
+    result = ConversionResult(source_path, output_path, format_name)
+    metadata = (metadata or MetadataOptions()).for_format(format_name)
+    settings = normalize_settings(format_name, settings)
+    start = time.perf_counter()
+    try:
+        with Image.open(source_path) as source:
+            source_size = source.size
+            result.width, result.height = source_size
+            draft_for_resize(source, resize)
+            metadata_kwargs = get_metadata_kwargs(source, format_name, metadata)
+            image = render_image(source, resize, metadata, source_size)
+            if (auto_quality and supports_option(format_name, "quality")
+                    and not settings.get("lossless")):
+                choice = find_auto_quality(image, format_name, target, settings=settings)
+                settings["quality"], result.score = choice.quality, choice.score
+            result.quality = settings.get("quality")
+            result.settings = settings
+            report = encode_image(image, output_path, format_name, settings, metadata_kwargs)
+            del image
+        if report is not None:
+            result.bytes_saved = report.bytes_saved
+        result.size_bytes = os.path.getsize(output_path)
+    except Exception as e:
+        result.error = str(e)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def convert_batch(
+    source_paths: Iterable[str],
+    output_dir: str,
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None,
+    auto_quality: bool = False,
+    target: float = DEFAULT_AUTO_QUALITY_TARGET,
+    resize: Optional[ResizeOptions] = None,
+    metadata: Optional[MetadataOptions] = None,
+    max_workers: Optional[int] = None
+) -> List[ConversionResult]:
+    """Convert many files in parallel.
+    
+    Args:
+        source_paths: Paths of the input files
+        output_dir: Directory the converted files are written to
+        format_name: Target format name
+        settings: Encoder option values, missing ones use the defaults
+        auto_quality: Pick the quality per file from ``target``
+        target: SSIM target used by auto quality
+        resize: Optional resize applied to every file before encoding
+        metadata: Metadata options, ``None`` for the defaults
+        max_workers: Number of worker threads, ``None`` for the default
+    
+    Returns:
+        One result per input file, in input order.
+    """
+    if format_name not in FORMATS:
+        raise ValueError(f"Unsupported format: {format_name}")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    def run(source_path: str) -> ConversionResult:
+        return convert_file(
+            source_path,
+            get_output_path(source_path, output_dir, format_name),
+            format_name,
+            settings,
+            auto_quality,
+            target,
+            resize,
+            metadata
+        )
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, source_paths))
+
+
+def list_batch(
+    source_paths: Iterable[str],
+    max_workers: Optional[int] = None
+) -> List[Optional[ImageInfo]]:
+    """Read header details of many files without decoding any pixels.
+    
+    Args:
+        source_paths: Paths of the input files
+        max_workers: Number of worker threads, ``None`` for the default
+    
+    Returns:
+        One entry per input file, in input order; None for unreadable files.
+    """
+    def read(source_path: str) -> Optional[ImageInfo]:
+        try:
+            return read_image_info(source_path)
+        except Exception:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read, source_paths))
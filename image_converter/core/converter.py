@@ -0,0 +1,127 @@
+"""Shared conversion helpers used by both the GUI and the batch API."""
+from typing import Any, BinaryIO, Dict, Mapping, Optional, Tuple, Union
+
+from PIL import Image
+
+from .encoders import get_save_kwargs, normalize_settings
+from .metadata import MetadataOptions, apply_metadata
+from .png_optimizer import PngOptimizationResult, optimize_png
+from .quantize import PaletteCache, to_palette_image
+from .resize import ResizeOptions, resize_image
+
+
+def render_image(
+    source: Image.Image,
+    resize: Optional[ResizeOptions] = None,
+    metadata: Optional[MetadataOptions] = None,
+    source_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """Run the pixel stages of the pipeline: resize, then orientation and color.
+    
+    Orientation and color conversion run after the resize so they touch the
+    smaller raster.
+    
+    Args:
+        source: The opened source image
+        resize: Optional resize options
+        metadata: Optional metadata options
+        source_size: Size of ``source`` before any JPEG draft
+    
+    Returns:
+        The image ready to be encoded, or ``source`` itself if nothing changed.
+    """
+    image = resize_image(source, resize, source_size)
+    if metadata is not None:
+        image = apply_metadata(image, source, metadata)
+    return image
+
+
+def uses_palette(format_name: str, settings: Optional[Mapping[str, Any]] = None) -> bool:
+    """Check whether output goes through the palette quantization stage.
+    
+    Args:
+        format_name: Target format name
+        settings: Encoder option values
+    
+    Returns:
+        True for GIF and for PNG with the PNG-8 option.
+    """
+    if format_name == "GIF":
+        return True
+    return format_name == "PNG" and normalize_settings(format_name, settings)["palette"]
+
+
+def prepare_image(
+    image: Image.Image,
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None,
+    palette_cache: Optional[PaletteCache] = None
+) -> Image.Image:
+    """Convert an image to a mode the target encoder can write.
+    
+    Args:
+        image: The source image
+        format_name: Target format name (a key of ``FORMATS``)
+        settings: Encoder option values
+        palette_cache: Cache to reuse palettes from for paletted output
+    
+    Returns:
+        The image itself when no conversion is needed, otherwise a converted copy.
+    """
+    settings = normalize_settings(format_name, settings)
+    if format_name == "JPEG" and image.mode != "RGB":
+        return image.convert("RGB")
+    if (format_name == "TIFF" and settings["compression"] == "jpeg"
+            and image.mode not in ("RGB", "L", "CMYK")):
+        return image.convert("RGB")
+    if uses_palette(format_name, settings):
+        if image.mode == "P" and settings["colors"] == 256:
+            return image
+        return to_palette_image(
+            image,
+            settings["colors"],
+            settings["quantizer"],
+            settings["dither"],
+            palette_cache
+        )
+    return image
+
+
+def encode_image(
+    image: Image.Image,
+    fp: Union[str, BinaryIO],
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None,
+    metadata_kwargs: Optional[Dict[str, Any]] = None,
+    palette_cache: Optional[PaletteCache] = None
+) -> Optional[PngOptimizationResult]:
+    """Encode an image to a path or file object in the given format.
+    
+    PNG output with the ``deep_optimize`` option goes through ``optimize_png``.
+    
+    Args:
+        image: The source image
+        fp: Output path or writable binary file object
+        format_name: Target format name
+        settings: Encoder option values, missing ones use the defaults
+        metadata_kwargs: Metadata options from ``get_metadata_kwargs``
+        palette_cache: Cache to reuse palettes from for paletted output
+    
+    Returns:
+        The PNG optimization report if the optimizer ran, otherwise None.
+    """
+    settings = normalize_settings(format_name, settings)
+    image = prepare_image(image, format_name, settings, palette_cache)
+    save_kwargs = {**get_save_kwargs(format_name, settings), **(metadata_kwargs or {})}
+    
+    if format_name == "PNG" and settings["deep_optimize"]:
+        result = optimize_png(image, save_kwargs, settings["optimize_budget"])
+        if isinstance(fp, str):
+            with open(fp, 'wb') as f:
+                f.write(result.data)
+        else:
+            fp.write(result.data)
+        return result
+    
+    image.save(fp, format=format_name, **save_kwargs)
+    return None
@@ -0,0 +1,220 @@
+"""Per-format encoder capabilities and options."""
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from ..constants import DEFAULT_PNG_OPTIMIZE_BUDGET, DEFAULT_QUALITY, MAX_QUALITY, MIN_QUALITY
+from .quantize import MEDIAN_CUT, QUANTIZERS
+
+# Option kinds
+INT_OPTION = "int"
+BOOL_OPTION = "bool"
+CHOICE_OPTION = "choice"
+
+
+@dataclass(frozen=True)
+class EncoderOption:
+    """One setting an encoder accepts.
+    
+    Attributes:
+        name: Option name, also the ``Image.save`` keyword unless ``save_kwarg`` is False
+        label: Label shown in the UI
+        kind: One of ``INT_OPTION``, ``BOOL_OPTION`` or ``CHOICE_OPTION``
+        default: Default value
+        minimum: Lowest value of an int option
+        maximum: Highest value of an int option
+        choices: ``(label, value)`` pairs of a choice option
+        save_kwarg: Whether the option is passed straight to ``Image.save``
+    """
+    name: str
+    label: str
+    kind: str
+    default: Any
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+    choices: Tuple[Tuple[str, Any], ...] = ()
+    save_kwarg: bool = True
+    
+    def normalize(self, value: Any) -> Any:
+        """Coerce a value to a valid setting, falling back to the default.
+        
+        Args:
+            value: The requested value
+        
+        Returns:
+            A valid value for this option.
+        """
+        try:
+            if self.kind == INT_OPTION:
+                return max(self.minimum, min(self.maximum, int(value)))
+            if self.kind == BOOL_OPTION:
+                return bool(value)
+            if self.kind == CHOICE_OPTION:
+                values = [choice for _, choice in self.choices]
+                return value if value in values else self.default
+        except (TypeError, ValueError):
+            pass
+        return self.default
+
+
+_QUALITY = EncoderOption(
+    "quality", "Quality", INT_OPTION, DEFAULT_QUALITY, MIN_QUALITY, MAX_QUALITY
+)
+
+# Options of the palette quantization stage, applied before encoding
+_PALETTE_OPTIONS = (
+    EncoderOption("colors", "Palette size", INT_OPTION, 256, 2, 256, save_kwarg=False),
+    EncoderOption(
+        "quantizer",
+        "Quantizer",
+        CHOICE_OPTION,
+        MEDIAN_CUT,
+        choices=QUANTIZERS,
+        save_kwarg=False
+    ),
+    EncoderOption("dither", "Dithering", BOOL_OPTION, True, save_kwarg=False)
+)
+
+# Options supported by each output format in FORMATS, in display order
+ENCODER_OPTIONS: Dict[str, Tuple[EncoderOption, ...]] = {
+    "JPEG": (
+        _QUALITY,
+        EncoderOption("optimize", "Optimize Huffman tables", BOOL_OPTION, False),
+        EncoderOption("progressive", "Progressive", BOOL_OPTION, False)
+    ),
+    "PNG": (
+        EncoderOption("compress_level", "Compression level", INT_OPTION, 6, 0, 9),
+        EncoderOption("optimize", "Optimize (slower, smaller)", BOOL_OPTION, False),
+        EncoderOption(
+            "deep_optimize",
+            "Deep optimize (search filters, zlib and color type)",
+            BOOL_OPTION,
+            False,
+            save_kwarg=False
+        ),
+        EncoderOption(
+            "optimize_budget",
+            "Optimize time budget (s)",
+            INT_OPTION,
+            DEFAULT_PNG_OPTIMIZE_BUDGET,
+            1,
+            60,
+            save_kwarg=False
+        ),
+        EncoderOption("palette", "8-bit palette (PNG-8)", BOOL_OPTION, False, save_kwarg=False)
+    ) + _PALETTE_OPTIONS,
+    "BMP": (),
+    "TIFF": (
+        EncoderOption(
+            "compression",
+            "Compression",
+            CHOICE_OPTION,
+            None,
+            choices=(
+                ("None", None),
+                ("LZW", "tiff_lzw"),
+                ("Deflate", "tiff_adobe_deflate"),
+                ("PackBits", "packbits"),
+                ("JPEG", "jpeg")
+            )
+        ),
+    ),
+    "WEBP": (
+        _QUALITY,
+        EncoderOption("lossless", "Lossless", BOOL_OPTION, False),
+        EncoderOption("method", "Effort (0 fast - 6 small)", INT_OPTION, 4, 0, 6)
+    ),
+    "GIF": _PALETTE_OPTIONS
+}
+
+
+def get_encoder_options(format_name: str) -> Tuple[EncoderOption, ...]:
+    """Get the options a format's encoder supports.
+    
+    Args:
+        format_name: Format name (a key of ``FORMATS``)
+    
+    Returns:
+        The supported options, in display order.
+    """
+    return ENCODER_OPTIONS.get(format_name, ())
+
+
+def supports_option(format_name: str, option_name: str) -> bool:
+    """Check whether a format's encoder supports an option.
+    
+    Args:
+        format_name: Format name
+        option_name: Option name (e.g. ``"quality"``)
+    
+    Returns:
+        True if the option is supported.
+    """
+    return any(option.name == option_name for option in get_encoder_options(format_name))
+
+
+def get_default_settings(format_name: str) -> Dict[str, Any]:
+    """Get the default settings of a format's encoder.
+    
+    Args:
+        format_name: Format name
+    
+    Returns:
+        Option values keyed by option name.
+    """
+    return {option.name: option.default for option in get_encoder_options(format_name)}
+
+
+def normalize_settings(
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None
+) -> Dict[str, Any]:
+    """Validate settings for a format, filling in defaults.
+    
+    Unknown options are dropped and invalid values replaced by defaults.
+    
+    Args:
+        format_name: Format name
+        settings: Requested option values
+    
+    Returns:
+        A complete, valid settings dictionary.
+    """
+    settings = settings or {}
+    return {
+        option.name: option.normalize(settings.get(option.name, option.default))
+        for option in get_encoder_options(format_name)
+    }
+
+
+def settings_key(format_name: str, settings: Optional[Mapping[str, Any]] = None) -> Hashable:
+    """Build a hashable cache key covering every encoder option.
+    
+    Args:
+        format_name: Format name
+        settings: Option values
+    
+    Returns:
+        A tuple identifying the format and its normalized settings.
+    """
+    return (format_name,) + tuple(normalize_settings(format_name, settings).items())
+
+
+def get_save_kwargs(
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the encoder keyword arguments passed to ``Image.save``.
+    
+    Args:
+        format_name: Format name
+        settings: Option values
+    
+    Returns:
+        A dictionary of encoder options.
+    """
+    normalized = normalize_settings(format_name, settings)
+    return {
+        option.name: normalized[option.name]
+        for option in get_encoder_options(format_name)
+        if option.save_kwarg
+    }
@@ -0,0 +1,298 @@
+"""Metadata handling: EXIF orientation, EXIF/ICC/XMP passthrough and sRGB conversion."""
+import io
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from PIL import ExifTags, Image
+from PIL.PngImagePlugin import PngInfo
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow built without littlecms
+    ImageCms = None
+
+# Formats whose Pillow encoders can embed each kind of metadata
+EXIF_FORMATS = ("JPEG", "PNG", "WEBP", "TIFF")
+ICC_FORMATS = ("JPEG", "PNG", "WEBP", "TIFF")
+XMP_FORMATS = ("JPEG", "PNG", "WEBP", "TIFF")
+
+# TIFF tag holding an XMP packet
+_XMP_TAG = 700
+
+# Descriptive TIFF tags carried over as EXIF; structural tags are rewritten by the encoder
+_TIFF_EXIF_TAGS = (
+    ExifTags.Base.ImageDescription,
+    ExifTags.Base.Make,
+    ExifTags.Base.Model,
+    ExifTags.Base.Orientation,
+    ExifTags.Base.Software,
+    ExifTags.Base.DateTime,
+    ExifTags.Base.Artist,
+    ExifTags.Base.Copyright
+)
+
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90
+}
+
+# Orientations that swap width and height
+SWAPPED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+@dataclass(frozen=True)
+class MetadataOptions:
+    """How metadata is treated during conversion.
+    
+    Attributes:
+        apply_orientation: Rotate/flip pixels according to the EXIF orientation
+        keep_exif: Copy EXIF data to the output
+        keep_icc: Copy the ICC profile to the output
+        keep_xmp: Copy the XMP packet to the output
+        convert_to_srgb: Convert pixels from the embedded ICC profile to sRGB
+    """
+    apply_orientation: bool = True
+    keep_exif: bool = True
+    keep_icc: bool = True
+    keep_xmp: bool = True
+    convert_to_srgb: bool = False
+    
+    def for_format(self, format_name: str) -> "MetadataOptions":
+        """Adjust the options to what a format can store.
+        
+        Formats without EXIF support cannot carry an Orientation tag, so
+        their pixels are always rotated; otherwise they would display sideways.
+        
+        Args:
+            format_name: Target format name
+        
+        Returns:
+            The options to use for that format.
+        """
+        if self.apply_orientation or format_name in EXIF_FORMATS:
+            return self
+        return replace(self, apply_orientation=True)
+
+
+def read_exif(image: Image.Image) -> Image.Exif:
+    """Read EXIF data from the already parsed header only.
+    
+    ``Image.getexif()`` loads the whole raster for some formats (e.g. PNG
+    with the eXIf chunk after the image data); this never does.
+    
+    Args:
+        image: An opened image
+    
+    Returns:
+        The EXIF data, empty if the header has none.
+    """
+    if image.format == "TIFF":
+        source = image.getexif()
+        exif = Image.Exif()
+        for tag in _TIFF_EXIF_TAGS:
+            if tag in source:
+                exif[tag] = source[tag]
+        for ifd in (ExifTags.IFD.Exif, ExifTags.IFD.GPSInfo):
+            values = source.get_ifd(ifd)
+            if values:
+                exif[ifd] = dict(values)
+        return exif
+    
+    exif = Image.Exif()
+    data = image.info.get("exif")
+    if data:
+        exif.load(data)
+    return exif
+
+
+def read_xmp(image: Image.Image) -> Optional[bytes]:
+    """Get the raw XMP packet of an opened image, if any.
+    
+    Args:
+        image: An opened image
+    
+    Returns:
+        The XMP packet as bytes, or None.
+    """
+    xmp = image.info.get("xmp") or image.info.get("XML:com.adobe.xmp")
+    if isinstance(xmp, str):
+        xmp = xmp.encode("utf-8")
+    return xmp or None
+
+
+def get_orientation(image: Image.Image, exif: Optional[Image.Exif] = None) -> int:
+    """Get the EXIF orientation of an opened image from its header.
+    
+    Args:
+        image: An opened image
+        exif: EXIF data already read from ``image``, to avoid parsing it again
+    
+    Returns:
+        The orientation value, 1 if absent or invalid.
+    """
+    if exif is None:
+        exif = read_exif(image)
+    orientation = exif.get(ExifTags.Base.Orientation, 1)
+    return orientation if orientation in _ORIENTATION_TRANSPOSE else 1
+
+
+def apply_orientation(image: Image.Image, orientation: int) -> Image.Image:
+    """Transpose pixels so the image displays upright.
+    
+    Args:
+        image: The image to transpose
+        orientation: EXIF orientation of the source
+    
+    Returns:
+        The transposed image, or the image itself for orientation 1.
+    """
+    method = _ORIENTATION_TRANSPOSE.get(orientation)
+    return image if method is None else image.transpose(method)
+
+
+def _srgb_profile_bytes() -> bytes:
+    """Serialize a built-in sRGB profile for embedding."""
+    return ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+
+
+def convert_to_srgb(
+    image: Image.Image,
+    icc_profile: Optional[bytes],
+    in_place: bool = False
+) -> Image.Image:
+    """Convert pixels from an embedded ICC profile to sRGB.
+    
+    Args:
+        image: The image to convert
+        icc_profile: The source ICC profile, or None to do nothing
+        in_place: Modify ``image`` directly when its mode is kept, avoiding a
+            raster copy; only pass True for images the caller owns
+    
+    Returns:
+        The converted image, or the image itself if nothing was done. Images
+        with alpha or a transparency key come back as ``RGBA``.
+    """
+    if ImageCms is None or not icc_profile:
+        return image
+    
+    source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+    srgb_profile = ImageCms.createProfile("sRGB")
+    
+    transparent = image.mode in ("LA", "PA", "RGBA") or "transparency" in image.info
+    if transparent and image.mode != "RGBA":
+        # Only the color channels go through the profile; alpha is carried over
+        color_mode = "L" if source_profile.profile.xcolor_space.strip() == "GRAY" else "RGB"
+        with_alpha = image.convert("LA" if color_mode == "L" else "RGBA")
+        output = ImageCms.profileToProfile(
+            with_alpha.convert(color_mode),
+            source_profile,
+            srgb_profile,
+            outputMode="RGB"
+        )
+        output.putalpha(with_alpha.getchannel("A"))
+        return output
+    
+    output_mode = image.mode if image.mode in ("RGB", "RGBA") else "RGB"
+    if image.mode not in ("RGB", "RGBA", "CMYK", "L"):
+        image = image.convert(output_mode)
+        in_place = True
+    
+    if in_place and output_mode == image.mode:
+        ImageCms.profileToProfile(image, source_profile, srgb_profile, inPlace=True)
+        return image
+    return ImageCms.profileToProfile(
+        image,
+        source_profile,
+        srgb_profile,
+        outputMode=output_mode
+    )
+
+
+def get_metadata_kwargs(
+    source: Image.Image,
+    format_name: str,
+    options: MetadataOptions
+) -> Dict[str, Any]:
+    """Build the metadata-related ``Image.save`` arguments for a conversion.
+    
+    Stripped metadata is passed explicitly as empty so encoders that would
+    otherwise fall back to the source image's ``info`` do not copy it. The
+    Orientation tag is kept whenever orientation is not applied, even if
+    the rest of EXIF is stripped.
+    
+    Args:
+        source: The opened source image (only its header is read)
+        format_name: Target format name
+        options: Metadata options
+    
+    Returns:
+        A dictionary of encoder options.
+    """
+    save_kwargs: Dict[str, Any] = {}
+    
+    if format_name in EXIF_FORMATS:
+        exif = read_exif(source) if options.keep_exif else Image.Exif()
+        if options.apply_orientation:
+            if ExifTags.Base.Orientation in exif:
+                del exif[ExifTags.Base.Orientation]
+        else:
+            # Unrotated pixels still need the tag to display upright
+            orientation = get_orientation(source)
+            if orientation != 1:
+                exif[ExifTags.Base.Orientation] = orientation
+        xmp = read_xmp(source) if options.keep_xmp else None
+        if format_name == "TIFF" and xmp:
+            exif[_XMP_TAG] = xmp
+        save_kwargs["exif"] = exif.tobytes() if len(exif) else b""
+    
+    if format_name in ICC_FORMATS:
+        icc_profile = source.info.get("icc_profile") if options.keep_icc else None
+        if icc_profile and options.convert_to_srgb and ImageCms is not None:
+            icc_profile = _srgb_profile_bytes()
+        save_kwargs["icc_profile"] = icc_profile
+    
+    if format_name in XMP_FORMATS and format_name != "TIFF":
+        xmp = read_xmp(source) if options.keep_xmp else None
+        if format_name == "PNG":
+            if xmp:
+                pnginfo = PngInfo()
+                pnginfo.add_itxt("XML:com.adobe.xmp", xmp.decode("utf-8", "replace"))
+                save_kwargs["pnginfo"] = pnginfo
+        else:
+            save_kwargs["xmp"] = xmp or b""
+    
+    return save_kwargs
+
+
+def apply_metadata(
+    image: Image.Image,
+    source: Image.Image,
+    options: MetadataOptions
+) -> Image.Image:
+    """Apply the pixel-level metadata options to an image.
+    
+    Orientation is applied with a single transpose and sRGB conversion is
+    done in place whenever ``image`` is already a private copy of ``source``.
+    
+    Args:
+        image: The image to process, possibly resized from ``source``
+        source: The opened source image, used to read metadata from
+        options: Metadata options
+    
+    Returns:
+        The processed image.
+    """
+    if options.apply_orientation:
+        image = apply_orientation(image, get_orientation(source))
+    if options.convert_to_srgb:
+        image = convert_to_srgb(
+            image,
+            source.info.get("icc_profile"),
+            in_place=image is not source
+        )
+    return image
@@ -0,0 +1,85 @@
+"""Fast perceptual quality metrics computed on downscaled luma planes."""
+import numpy as np
+from PIL import Image
+
+from ..constants import METRIC_MAX_SIZE, SSIM_WINDOW
+
+# SSIM stabilisation constants for 8-bit data
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+
+def luma_array(image: Image.Image, max_size: int = METRIC_MAX_SIZE) -> np.ndarray:
+    """Return the luma plane of an image as a float64 array.
+    
+    The image is converted to ``L`` and shrunk so its longest side does not
+    exceed ``max_size``, using ``reduce()`` for the integer part of the scale.
+    
+    Args:
+        image: The source image
+        max_size: Longest side of the returned plane
+    
+    Returns:
+        A 2-D array of luma values in the 0-255 range.
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    factor = max(gray.width, gray.height) // max_size
+    if factor > 1:
+        gray = gray.reduce(factor)
+    if max(gray.width, gray.height) > max_size:
+        gray = gray.copy()
+        gray.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    return np.asarray(gray, dtype=np.float64)
+
+
+def _box_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean over every ``window`` x ``window`` block using an integral image.
+    
+    Args:
+        values: 2-D input array
+        window: Side length of the averaging window
+    
+    Returns:
+        The "valid" region of the box-filtered array.
+    """
+    integral = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = (
+        integral[window:, window:]
+        - integral[:-window, window:]
+        - integral[window:, :-window]
+        + integral[:-window, :-window]
+    )
+    return sums / (window * window)
+
+
+def ssim(reference: np.ndarray, distorted: np.ndarray, window: int = SSIM_WINDOW) -> float:
+    """Compute the mean structural similarity of two luma planes.
+    
+    Args:
+        reference: Luma plane of the original image
+        distorted: Luma plane of the encoded image, same shape as ``reference``
+        window: Side length of the local statistics window
+    
+    Returns:
+        The mean SSIM, where 1.0 means identical.
+    
+    Raises:
+        ValueError: If the planes differ in shape.
+    """
+    if reference.shape != distorted.shape:
+        raise ValueError(
+            f"Luma planes differ in shape: {reference.shape} vs {distorted.shape}"
+        )
+    window = min(window, *reference.shape)
+    if window < 1:
+        return 1.0
+    
+    mu_x = _box_mean(reference, window)
+    mu_y = _box_mean(distorted, window)
+    var_x = _box_mean(reference * reference, window) - mu_x * mu_x
+    var_y = _box_mean(distorted * distorted, window) - mu_y * mu_y
+    cov_xy = _box_mean(reference * distorted, window) - mu_x * mu_y
+    
+    numerator = (2 * mu_x * mu_y + _SSIM_C1) * (2 * cov_xy + _SSIM_C2)
+    denominator = (mu_x * mu_x + mu_y * mu_y + _SSIM_C1) * (var_x + var_y + _SSIM_C2)
+    return float(np.mean(numerator / denominator))
@@ -0,0 +1,461 @@
+"""PNG optimizer searching color types, row filters and zlib settings in parallel."""
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..constants import (
+    DEFAULT_PNG_OPTIMIZE_BUDGET,
+    PNG_COMPRESS_CHUNK_BYTES,
+    PNG_FILTER_BAND_BYTES,
+    PNG_ZLIB_LEVELS
+)
+
+# PNG row filter types, plus per-row adaptive selection
+FILTER_NONE = 0
+FILTER_SUB = 1
+FILTER_UP = 2
+FILTER_AVERAGE = 3
+FILTER_PAETH = 4
+FILTER_ADAPTIVE = 5
+FILTER_NAMES: Tuple[str, ...] = ("None", "Sub", "Up", "Average", "Paeth", "Adaptive")
+
+# zlib strategies tried, as (name, value) pairs
+ZLIB_STRATEGIES: Tuple[Tuple[str, int], ...] = (
+    ("default", zlib.Z_DEFAULT_STRATEGY),
+    ("filtered", zlib.Z_FILTERED),
+    ("rle", zlib.Z_RLE)
+)
+
+# Filters in the order they are tried; the most likely winners come first
+_FILTER_ORDER = (
+    FILTER_ADAPTIVE,
+    FILTER_NONE,
+    FILTER_PAETH,
+    FILTER_UP,
+    FILTER_SUB,
+    FILTER_AVERAGE
+)
+
+# Raw modes of the scanlines Pillow writes, keyed by (image mode, bit depth)
+_RAWMODES = {
+    ("1", 1): "1",
+    ("L", 8): "L",
+    ("LA", 8): "LA",
+    ("RGB", 8): "RGB",
+    ("RGBA", 8): "RGBA",
+    ("P", 1): "P;1",
+    ("P", 2): "P;2",
+    ("P", 4): "P;4",
+    ("P", 8): "P"
+}
+
+# Samples per pixel of each PNG color type
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class PngOptimizationResult:
+    """Outcome of optimizing one PNG.
+    
+    Attributes:
+        data: The optimized PNG file
+        original_size: Size of a plain save with the requested settings
+        mode: Image mode written after color type reduction
+        filter_name: Row filter used, or ``"Pillow"`` if the plain save won
+        level: zlib level used, ``None`` if the plain save won
+        strategy: zlib strategy used, ``None`` if the plain save won
+        trials: Number of settings combinations compressed
+        elapsed: Time spent, in seconds
+    """
+    data: bytes = field(repr=False)
+    original_size: int
+    mode: str
+    filter_name: str
+    level: Optional[int] = None
+    strategy: Optional[str] = None
+    trials: int = 0
+    elapsed: float = 0.0
+    
+    @property
+    def size(self) -> int:
+        """Size of the optimized file in bytes."""
+        return len(self.data)
+    
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes saved compared to the plain save."""
+        return self.original_size - self.size
+
+
+def _exact_palette_image(image: Image.Image) -> Image.Image:
+    """Convert an image with at most 256 colors to ``P`` without losing anything.
+    
+    Args:
+        image: An ``L``, ``LA``, ``RGB`` or ``RGBA`` image with at most 256 colors
+    
+    Returns:
+        The palette image.
+    """
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:
+        pixels = pixels[..., None]
+    rgba = np.empty(pixels.shape[:2] + (4,), dtype=np.uint8)
+    if image.mode in ("L", "LA"):
+        rgba[..., :3] = pixels[..., :1]
+    else:
+        rgba[..., :3] = pixels[..., :3]
+    rgba[..., 3] = pixels[..., -1] if image.mode in ("LA", "RGBA") else 255
+    
+    # Translucent entries first so the tRNS chunk stays short, then by frequency
+    entries, inverse, counts = np.unique(
+        rgba.reshape(-1, 4).view(np.uint32).ravel(),
+        return_inverse=True,
+        return_counts=True
+    )
+    palette = entries.view(np.uint8).reshape(-1, 4)
+    order = np.lexsort((-counts, palette[:, 3] == 255))
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    
+    indices = rank[inverse].astype(np.uint8).reshape(pixels.shape[:2])
+    palette_image = Image.fromarray(indices, "P")
+    palette_image.putpalette(palette[order, :3].ravel().tolist())
+    alpha = palette[order, 3]
+    if (alpha < 255).any():
+        palette_image.info["transparency"] = bytes(alpha[:np.count_nonzero(alpha < 255)])
+    return palette_image
+
+
+def reduce_color_type(image: Image.Image) -> List[Image.Image]:
+    """Build lossless color type reductions of an image.
+    
+    Opaque alpha channels are dropped, gray RGB becomes ``L`` and images
+    with at most 256 colors become ``P``.
+    
+    Args:
+        image: The image to reduce
+    
+    Returns:
+        The reduced images, smallest color type first; empty if none apply.
+    """
+    if image.mode not in ("L", "LA", "RGB", "RGBA"):
+        return []
+    
+    reduced = image
+    if reduced.mode in ("LA", "RGBA") and reduced.getextrema()[-1][0] == 255:
+        reduced = reduced.convert(reduced.mode[:-1])
+    if reduced.mode in ("RGB", "RGBA"):
+        pixels = np.asarray(reduced)
+        if (pixels[..., 0] == pixels[..., 1]).all() and (pixels[..., 1] == pixels[..., 2]).all():
+            reduced = reduced.convert("LA" if reduced.mode == "RGBA" else "L")
+    
+    candidates = [reduced] if reduced.mode != image.mode else []
+    # 8-bit gray only gains from a palette when it can be packed into fewer bits
+    max_colors = 16 if reduced.mode == "L" else 256
+    if reduced.getcolors(max_colors) is not None:
+        candidates.insert(0, _exact_palette_image(reduced))
+    return candidates
+
+
+def _read_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Split a PNG file into ``(type, data)`` chunks."""
+    chunks = []
+    position = len(_PNG_SIGNATURE)
+    while position < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        chunks.append((chunk_type, data[position + 8:position + 8 + length]))
+        position += length + 12
+    return chunks
+
+
+def _write_chunk(output: io.BytesIO, chunk_type: bytes, data: bytes) -> None:
+    """Append one chunk with its length and CRC."""
+    output.write(struct.pack(">I", len(data)))
+    output.write(chunk_type)
+    output.write(data)
+    output.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+
+def _replace_image_data(data: bytes, image_data: bytes) -> bytes:
+    """Swap the IDAT chunks of a PNG for new compressed image data."""
+    output = io.BytesIO()
+    output.write(_PNG_SIGNATURE)
+    written = False
+    for chunk_type, chunk_data in _read_chunks(data):
+        if chunk_type == b"IDAT":
+            if not written:
+                _write_chunk(output, b"IDAT", image_data)
+                written = True
+        else:
+            _write_chunk(output, chunk_type, chunk_data)
+    return output.getvalue()
+
+
+def _scanlines(image: Image.Image, header: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """Get the unfiltered scanlines Pillow wrote for an image.
+    
+    Args:
+        image: The saved image
+        header: Its IHDR chunk data
+    
+    Returns:
+        The rows as a 2-D array and the filter byte distance, or None if the
+        layout is not supported (16-bit or interlaced output).
+    """
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", header)
+    rawmode = _RAWMODES.get((image.mode, bit_depth))
+    if rawmode is None or interlace:
+        return None
+    channels = _CHANNELS[color_type]
+    stride = (width * channels * bit_depth + 7) // 8
+    rows = np.frombuffer(image.tobytes("raw", rawmode), dtype=np.uint8)
+    return rows.reshape(height, stride), max(1, channels * bit_depth // 8)
+
+
+def _filter_band(current: np.ndarray, previous: np.ndarray, bpp: int, filter_type: int) -> np.ndarray:
+    """Apply a PNG row filter to a band of scanlines.
+    
+    Args:
+        current: Unfiltered rows of the band, as ``int16``
+        previous: The row above each of those rows, as ``int16``
+        bpp: Distance in bytes to the corresponding byte of the previous pixel
+        filter_type: One of the ``FILTER_*`` values
+    
+    Returns:
+        The filtered band, each row prefixed with its filter type byte.
+    """
+    left = np.zeros_like(current)
+    left[:, bpp:] = current[:, :-bpp]
+    up = previous
+    
+    def paeth() -> np.ndarray:
+        up_left = np.zeros_like(current)
+        up_left[:, bpp:] = previous[:, :-bpp]
+        estimate = left + up - up_left
+        distance_left = np.abs(estimate - left)
+        distance_up = np.abs(estimate - up)
+        distance_up_left = np.abs(estimate - up_left)
+        predictor = np.where(
+            (distance_left <= distance_up) & (distance_left <= distance_up_left),
+            left,
+            np.where(distance_up <= distance_up_left, up, up_left)
+        )
+        return current - predictor
+    
+    filters = {
+        FILTER_NONE: lambda: current,
+        FILTER_SUB: lambda: current - left,
+        FILTER_UP: lambda: current - up,
+        FILTER_AVERAGE: lambda: current - (left + up) // 2,
+        FILTER_PAETH: paeth
+    }
+    
+    output = np.empty((current.shape[0], current.shape[1] + 1), dtype=np.uint8)
+    if filter_type == FILTER_ADAPTIVE:
+        filtered = np.stack([filters[kind]() & 0xFF for kind in range(FILTER_PAETH + 1)])
+        signed = np.minimum(filtered, 256 - filtered)
+        choice = signed.sum(axis=2, dtype=np.int64).argmin(axis=0)
+        output[:, 0] = choice
+        output[:, 1:] = filtered[choice, np.arange(current.shape[0])]
+    else:
+        output[:, 0] = filter_type
+        output[:, 1:] = filters[filter_type]() & 0xFF
+    return output
+
+
+def _filter_rows(rows: np.ndarray, bpp: int, filter_type: int) -> bytes:
+    """Apply a PNG row filter to every scanline.
+    
+    Rows are filtered in bands of about ``PNG_FILTER_BAND_BYTES``; each
+    filter only needs a row and the one above it, so the last row of a band
+    is carried into the next. Within a band all filters are single
+    vectorized passes. The adaptive filter picks, per row, the filter with
+    the smallest sum of absolute signed bytes.
+    
+    Args:
+        rows: Unfiltered scanlines
+        bpp: Distance in bytes to the corresponding byte of the previous pixel
+        filter_type: One of the ``FILTER_*`` values
+    
+    Returns:
+        The filtered stream, each row prefixed with its filter type byte.
+    """
+    height, stride = rows.shape
+    output = np.empty((height, stride + 1), dtype=np.uint8)
+    band = max(1, PNG_FILTER_BAND_BYTES // stride)
+    previous_row = np.zeros((1, stride), dtype=np.int16)
+    for top in range(0, height, band):
+        current = rows[top:top + band].astype(np.int16)
+        previous = np.concatenate((previous_row, current[:-1]))
+        output[top:top + band] = _filter_band(current, previous, bpp, filter_type)
+        previous_row = current[-1:]
+    return output.tobytes()
+
+
+def _compress(stream: bytes, level: int, strategy: int, deadline: float) -> Optional[bytes]:
+    """Compress a filtered stream with zlib (releases the GIL).
+    
+    The stream is fed in chunks of ``PNG_COMPRESS_CHUNK_BYTES`` so a slow
+    level cannot run far past the deadline.
+    
+    Args:
+        stream: The filtered scanlines
+        level: zlib compression level
+        strategy: zlib strategy value
+        deadline: ``time.perf_counter()`` value after which the attempt is dropped
+    
+    Returns:
+        The compressed data, or None if the deadline passed first.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    view = memoryview(stream)
+    parts = []
+    for offset in range(0, len(view), PNG_COMPRESS_CHUNK_BYTES):
+        if time.perf_counter() >= deadline:
+            return None
+        parts.append(compressor.compress(view[offset:offset + PNG_COMPRESS_CHUNK_BYTES]))
+    parts.append(compressor.flush())
+    return b"".join(parts)
+
+
+def _save_png(image: Image.Image, save_kwargs: Mapping[str, Any]) -> bytes:
+    """Encode an image with Pillow's PNG encoder."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", **save_kwargs)
+    return buffer.getvalue()
+
+
+def optimize_png(
+    image: Image.Image,
+    save_kwargs: Optional[Mapping[str, Any]] = None,
+    time_budget: float = DEFAULT_PNG_OPTIMIZE_BUDGET,
+    max_workers: Optional[int] = None
+) -> PngOptimizationResult:
+    """Find the smallest lossless PNG encoding of an image.
+    
+    Lossless color type reductions are combined with every row filter, zlib
+    level and zlib strategy. Compression runs on a thread pool, most
+    promising combinations first; once the time budget is spent no new
+    combinations are started and running ones are dropped. The plain save
+    with the requested settings is always made and is the only step that
+    can outlast the budget; the color type reductions count against it. Ancillary
+    chunks (metadata, palette, transparency) are taken from Pillow's own
+    output, and the plain save is kept if nothing beats it.
+    
+    Args:
+        image: The image to encode
+        save_kwargs: ``Image.save`` arguments, e.g. from ``get_save_kwargs``
+            and ``get_metadata_kwargs``
+        time_budget: Seconds after which no new work is started and running
+            compressions are dropped
+        max_workers: Number of worker threads, ``None`` for one per CPU
+    
+    Returns:
+        The optimization result holding the smallest file found.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    save_kwargs = dict(save_kwargs or {})
+    
+    plain = _save_png(image, save_kwargs)
+    best: Dict[str, Any] = {"data": plain, "mode": image.mode, "filter_name": "Pillow"}
+    trials = 0
+    
+    # Reduced candidates only need Pillow's output for their ancillary chunks,
+    # so a fast save is enough; none are added once the budget is spent
+    fast_kwargs = {**save_kwargs, "compress_level": 1, "optimize": False}
+    candidates: List[Tuple[Image.Image, bytes]] = []
+    for reduced in (reduce_color_type(image) if time.perf_counter() < deadline else []):
+        if time.perf_counter() >= deadline:
+            break
+        data = _save_png(reduced, fast_kwargs)
+        if len(data) < len(best["data"]):
+            best = {"data": data, "mode": reduced.mode, "filter_name": "Pillow"}
+        candidates.append((reduced, data))
+    candidates.append((image, plain))
+    
+    tasks = [
+        (filter_type, level, strategy, candidate)
+        for filter_type in _FILTER_ORDER
+        for level in PNG_ZLIB_LEVELS
+        for strategy in ZLIB_STRATEGIES
+        for candidate in range(len(candidates))
+    ]
+    streams: Dict[int, bytes] = {}
+    streams_filter: Optional[int] = None
+    layouts = [
+        _scanlines(reduced, dict(_read_chunks(data))[b"IHDR"])
+        for reduced, data in candidates
+    ]
+    
+    # Compression is CPU bound; one job per worker keeps the budget overrun short
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Dict[Future, Tuple[int, int, Tuple[str, int], int]] = {}
+        
+        for task in tasks:
+            if time.perf_counter() >= deadline:
+                break
+            filter_type, level, (_, strategy), candidate = task
+            if layouts[candidate] is None:
+                continue
+            if streams_filter != filter_type:
+                # Streams of earlier filters stay alive only while queued jobs use them
+                streams.clear()
+                streams_filter = filter_type
+            if candidate not in streams:
+                rows, bpp = layouts[candidate]
+                streams[candidate] = _filter_rows(rows, bpp, filter_type)
+            pending[executor.submit(_compress, streams[candidate], level, strategy, deadline)] = task
+            
+            while len(pending) >= workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    image_data = future.result()
+                    task = pending.pop(future)
+                    if image_data is not None:
+                        trials += 1
+                        best = _keep_smaller(best, image_data, task, candidates)
+        
+        for future in list(pending):
+            if not future.cancel() and future.result() is not None:
+                trials += 1
+                best = _keep_smaller(best, future.result(), pending[future], candidates)
+    
+    return PngOptimizationResult(
+        original_size=len(plain),
+        trials=trials,
+        elapsed=time.perf_counter() - start,
+        **best
+    )
+
+
+def _keep_smaller(
+    best: Dict[str, Any],
+    image_data: bytes,
+    task: Tuple[int, int, Tuple[str, int], int],
+    candidates: List[Tuple[Image.Image, bytes]]
+) -> Dict[str, Any]:
+    """Return the better of the current best and a finished combination."""
+    filter_type, level, (strategy_name, _), candidate = task
+    reduced, data = candidates[candidate]
+    chunk_overhead = sum(len(chunk) + 12 for kind, chunk in _read_chunks(data) if kind == b"IDAT")
+    if len(data) - chunk_overhead + len(image_data) + 12 >= len(best["data"]):
+        return best
+    return {
+        "data": _replace_image_data(data, image_data),
+        "mode": reduced.mode,
+        "filter_name": FILTER_NAMES[filter_type],
+        "level": level,
+        "strategy": strategy_name
+    }
@@ -0,0 +1,308 @@
+"""Windowed preview: a lazy tile pyramid and region-only encode comparison."""
+import io
+import math
+from collections import OrderedDict
+from typing import Any, Mapping, Optional, Tuple
+
+from PIL import Image
+
+from ..constants import (
+    PREVIEW_BLOCK_ALIGN,
+    PREVIEW_OVERVIEW_SIZE,
+    PREVIEW_TILE_CACHE_SIZE,
+    PREVIEW_TILE_SIZE
+)
+from .converter import prepare_image, uses_palette
+from .encoders import get_save_kwargs, normalize_settings
+from .quantize import PaletteCache, build_palette, has_alpha, quantize_image
+
+# Region in image pixels as (left, top, right, bottom)
+Box = Tuple[float, float, float, float]
+
+# Modes Image.reduce() handles that can also be displayed directly
+_DISPLAY_MODES = ("L", "RGB", "RGBA")
+
+
+def _reduce_region(image: Image.Image, box: Tuple[int, int, int, int], factor: int) -> Image.Image:
+    """Downscale one region of an image by an integer factor.
+    
+    Only the pixels inside ``box`` are read.
+    
+    Args:
+        image: The image to read from
+        box: Integer region to read
+        factor: Downscale factor, 1 to crop only
+    
+    Returns:
+        The region in a displayable mode.
+    """
+    if image.mode not in _DISPLAY_MODES:
+        region = image.crop(box).convert("RGBA" if has_alpha(image) else "RGB")
+        return region.reduce(factor) if factor > 1 else region
+    return image.reduce(factor, box) if factor > 1 else image.crop(box)
+
+
+class TilePyramid:
+    """Tiles of an image at power-of-two scales, built on first use.
+    
+    Level 0 is full resolution and each level halves the previous one.
+    Tiles of fine levels are cut straight from the image with
+    ``reduce(factor, box)``, so only the pixels under a tile are read. Levels
+    at or above the overview level are cut from a small overview image that
+    is built once, which makes zoomed-out views and low-res first passes
+    cheap. Recently used tiles are kept in an LRU cache.
+    """
+    
+    def __init__(
+        self,
+        image: Image.Image,
+        tile_size: int = PREVIEW_TILE_SIZE,
+        cache_size: int = PREVIEW_TILE_CACHE_SIZE
+    ) -> None:
+        """Create a pyramid; no pixels are processed until a tile is requested.
+        
+        Args:
+            image: The image to preview
+            tile_size: Side length of a tile in pixels
+            cache_size: Number of tiles kept
+        """
+        self.image = image
+        self.tile_size = tile_size
+        self.cache_size = cache_size
+        longest = max(image.size)
+        self.max_level = max(0, math.ceil(math.log2(longest / tile_size))) if longest > tile_size else 0
+        self.overview_level = max(
+            0, math.ceil(math.log2(longest / PREVIEW_OVERVIEW_SIZE))
+        ) if longest > PREVIEW_OVERVIEW_SIZE else 0
+        self._overview: Optional[Image.Image] = None
+        self._tiles: "OrderedDict[Tuple[int, int, int], Image.Image]" = OrderedDict()
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Size of the full-resolution image."""
+        return self.image.size
+    
+    def level_for_zoom(self, zoom: float) -> int:
+        """Pick the coarsest level that still has at least one pixel per screen pixel.
+        
+        Args:
+            zoom: Screen pixels per image pixel
+        
+        Returns:
+            The pyramid level.
+        """
+        if zoom >= 1:
+            return 0
+        return min(self.max_level, int(math.floor(math.log2(1 / zoom))))
+    
+    def level_size(self, level: int) -> Tuple[int, int]:
+        """Get the size of the image at a level.
+        
+        Args:
+            level: Pyramid level
+        
+        Returns:
+            The ``(width, height)`` at that level.
+        """
+        factor = 1 << level
+        width, height = self.image.size
+        return -(-width // factor), -(-height // factor)
+    
+    def get_overview(self) -> Image.Image:
+        """Get the overview image, building it on first use."""
+        if self._overview is None:
+            self._overview = _reduce_region(
+                self.image,
+                (0, 0) + self.image.size,
+                1 << self.overview_level
+            )
+        return self._overview
+    
+    def get_tile(self, level: int, column: int, row: int) -> Image.Image:
+        """Get one tile, building it on first use.
+        
+        Args:
+            level: Pyramid level
+            column: Tile column at that level
+            row: Tile row at that level
+        
+        Returns:
+            The tile, smaller than ``tile_size`` at the right and bottom edges.
+        """
+        key = (level, column, row)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        
+        if level >= self.overview_level:
+            source, factor = self.get_overview(), 1 << (level - self.overview_level)
+        else:
+            source, factor = self.image, 1 << level
+        span = self.tile_size * factor
+        box = (
+            column * span,
+            row * span,
+            min(source.width, (column + 1) * span),
+            min(source.height, (row + 1) * span)
+        )
+        tile = _reduce_region(source, box, factor)
+        
+        self._tiles[key] = tile
+        while len(self._tiles) > self.cache_size:
+            self._tiles.popitem(last=False)
+        return tile
+    
+    def _tile_range(self, box: Box, level: int) -> Tuple[range, range]:
+        """Get the tile columns and rows covering a region at a level."""
+        span = self.tile_size << level
+        width, height = self.level_size(level)
+        columns = range(int(box[0] // span), min(-(-width // self.tile_size), int(math.ceil(box[2] / span))))
+        rows = range(int(box[1] // span), min(-(-height // self.tile_size), int(math.ceil(box[3] / span))))
+        return columns, rows
+    
+    def is_ready(self, box: Box, level: int) -> bool:
+        """Check whether a region renders without reading full-resolution pixels.
+        
+        Args:
+            box: Region in full-resolution pixels
+            level: Pyramid level
+        
+        Returns:
+            True if every tile is cached or can be cut from the built overview.
+        """
+        if level >= self.overview_level and self._overview is not None:
+            return True
+        columns, rows = self._tile_range(box, level)
+        return all((level, column, row) in self._tiles for column in columns for row in rows)
+    
+    def render(self, box: Box, size: Tuple[int, int], level: Optional[int] = None) -> Image.Image:
+        """Render a region of the image at a display size from the tiles covering it.
+        
+        Args:
+            box: Region in full-resolution pixels, inside the image
+            size: Output size in screen pixels
+            level: Pyramid level to read, ``None`` for the one matching the zoom
+        
+        Returns:
+            The rendered region.
+        """
+        zoom = size[0] / max(1e-9, box[2] - box[0])
+        if level is None:
+            level = self.level_for_zoom(zoom)
+        columns, rows = self._tile_range(box, level)
+        
+        mosaic: Optional[Image.Image] = None
+        for row in rows:
+            for column in columns:
+                tile = self.get_tile(level, column, row)
+                if mosaic is None:
+                    mosaic = Image.new(tile.mode, (len(columns) * self.tile_size, len(rows) * self.tile_size))
+                mosaic.paste(
+                    tile,
+                    ((column - columns.start) * self.tile_size, (row - rows.start) * self.tile_size)
+                )
+        
+        # Region relative to the mosaic, in level pixels
+        factor = 1 << level
+        origin_x = columns.start * self.tile_size
+        origin_y = rows.start * self.tile_size
+        region = (
+            box[0] / factor - origin_x,
+            box[1] / factor - origin_y,
+            box[2] / factor - origin_x,
+            box[3] / factor - origin_y
+        )
+        resample = Image.Resampling.NEAREST if zoom >= 2 else Image.Resampling.BILINEAR
+        return mosaic.resize(size, resample, box=region)
+
+
+def visible_region(
+    image_size: Tuple[int, int],
+    center: Tuple[float, float],
+    zoom: float,
+    view_size: Tuple[int, int]
+) -> Tuple[Box, Tuple[int, int], Tuple[int, int]]:
+    """Work out which part of an image a view shows and where.
+    
+    Args:
+        image_size: Full-resolution image size
+        center: Image coordinates at the center of the view
+        zoom: Screen pixels per image pixel
+        view_size: View size in screen pixels
+    
+    Returns:
+        The visible region in image pixels, its position in the view and its
+        size in screen pixels.
+    """
+    view_left = center[0] - view_size[0] / 2 / zoom
+    view_top = center[1] - view_size[1] / 2 / zoom
+    box = (
+        max(0.0, view_left),
+        max(0.0, view_top),
+        min(float(image_size[0]), view_left + view_size[0] / zoom),
+        min(float(image_size[1]), view_top + view_size[1] / zoom)
+    )
+    position = (round((box[0] - view_left) * zoom), round((box[1] - view_top) * zoom))
+    size = (
+        max(1, round((box[2] - box[0]) * zoom)),
+        max(1, round((box[3] - box[1]) * zoom))
+    )
+    return box, position, size
+
+
+def encode_region(
+    image: Image.Image,
+    box: Tuple[int, int, int, int],
+    format_name: str,
+    settings: Optional[Mapping[str, Any]] = None,
+    palette_cache: Optional[PaletteCache] = None
+) -> Image.Image:
+    """Encode and decode only one region of an image, to preview artifacts.
+    
+    The region is widened to the codec block grid of the full image so block
+    artifacts appear where a full encode would put them. Paletted output maps
+    the region onto the full image's palette.
+    
+    Args:
+        image: The full image that would be encoded
+        box: Integer region to preview
+        format_name: Target format name
+        settings: Encoder option values
+        palette_cache: Cache to take the full image's palette from
+    
+    Returns:
+        The decoded region, the same size as ``box``.
+    """
+    settings = normalize_settings(format_name, settings)
+    align = PREVIEW_BLOCK_ALIGN
+    aligned = (
+        box[0] // align * align,
+        box[1] // align * align,
+        min(image.width, -(-box[2] // align) * align),
+        min(image.height, -(-box[3] // align) * align)
+    )
+    region = image.crop(aligned)
+    
+    if (uses_palette(format_name, settings)
+            and not (region.mode == "P" and settings["colors"] == 256)):
+        palette = (
+            palette_cache.get_palette(image, settings["colors"], settings["quantizer"])
+            if palette_cache is not None
+            else build_palette(image, settings["colors"], settings["quantizer"])
+        )
+        region = quantize_image(region, palette, settings["dither"])
+    else:
+        region = prepare_image(region, format_name, settings)
+    
+    buffer = io.BytesIO()
+    region.save(buffer, format=format_name, **get_save_kwargs(format_name, settings))
+    buffer.seek(0)
+    with Image.open(buffer) as decoded:
+        decoded = decoded.convert("RGBA" if has_alpha(decoded) else "RGB")
+    return decoded.crop((
+        box[0] - aligned[0],
+        box[1] - aligned[1],
+        box[2] - aligned[0],
+        box[3] - aligned[1]
+    ))
@@ -0,0 +1,430 @@
+"""Header-only image details, parallel directory scanning and a persistent probe index."""
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import astuple, dataclass, fields, replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import appdirs
+from PIL import Image
+
+from ..constants import (
+    APP_NAME,
+    COMPANY_NAME,
+    FORMATS,
+    PROBE_HASH_CHUNK_SIZE,
+    PROBE_INDEX_FILENAME
+)
+from ..utils.exceptions import ConfigError
+from .metadata import SWAPPED_ORIENTATIONS, get_orientation, read_exif, read_xmp
+
+# File extensions picked up by directory scans
+IMAGE_EXTENSIONS = frozenset(ext for extensions in FORMATS.values() for ext in extensions)
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """Image details read from the file header without decoding pixels.
+    
+    Attributes:
+        path: Absolute path of the file
+        format: Pillow format name
+        mode: Pillow image mode
+        width: Stored width in pixels
+        height: Stored height in pixels
+        orientation: EXIF orientation (1 if absent)
+        has_exif: Whether the file carries EXIF data
+        has_icc: Whether the file carries an ICC profile
+        has_xmp: Whether the file carries an XMP packet
+        frames: Number of frames (1 for still images)
+        mtime_ns: Modification time in nanoseconds
+        file_size: File size in bytes
+        hash: Hex digest of the file contents, if requested
+    """
+    path: str
+    format: Optional[str]
+    mode: str
+    width: int
+    height: int
+    orientation: int = 1
+    has_exif: bool = False
+    has_icc: bool = False
+    has_xmp: bool = False
+    frames: int = 1
+    mtime_ns: int = 0
+    file_size: int = 0
+    hash: Optional[str] = None
+    
+    @property
+    def display_size(self) -> Tuple[int, int]:
+        """Size of the image once its orientation is applied."""
+        if self.orientation in SWAPPED_ORIENTATIONS:
+            return self.height, self.width
+        return self.width, self.height
+
+
+# Column order of the index table, matching the ImageInfo fields
+_FIELDS = [field.name for field in fields(ImageInfo)]
+_COLUMNS = ", ".join(_FIELDS)
+
+# Bumped whenever the index table layout changes
+_INDEX_VERSION = 3
+
+# Index tables, both keyed by path and grouped by directory
+_TABLES = ("files", "failures")
+
+
+def hash_file(path: str) -> str:
+    """Hash the contents of a file.
+    
+    Args:
+        path: Path of the file
+    
+    Returns:
+        A 32-character hex BLAKE2b digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(PROBE_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_image_info(
+    path: str,
+    stat: Optional[os.stat_result] = None,
+    hash_files: bool = False
+) -> ImageInfo:
+    """Read format, size, metadata presence and file stat data from the header.
+    
+    Args:
+        path: Path of the image file
+        stat: Stat data of the file if already known
+        hash_files: Also hash the file contents (reads the whole file)
+    
+    Returns:
+        The image details.
+    """
+    path = os.path.abspath(path)
+    stat = stat or os.stat(path)
+    with Image.open(path) as image:
+        exif = read_exif(image)
+        return ImageInfo(
+            path=path,
+            format=image.format,
+            mode=image.mode,
+            width=image.width,
+            height=image.height,
+            orientation=get_orientation(image, exif),
+            has_exif=len(exif) > 0,
+            has_icc=bool(image.info.get("icc_profile")),
+            has_xmp=read_xmp(image) is not None,
+            frames=getattr(image, "n_frames", 1),
+            mtime_ns=stat.st_mtime_ns,
+            file_size=stat.st_size,
+            hash=hash_file(path) if hash_files else None
+        )
+
+
+def _from_row(row: Tuple) -> ImageInfo:
+    """Build an ImageInfo from an index row, restoring the flag types."""
+    info = ImageInfo(*row)
+    return replace(
+        info,
+        has_exif=bool(info.has_exif),
+        has_icc=bool(info.has_icc),
+        has_xmp=bool(info.has_xmp)
+    )
+
+
+class ProbeIndex:
+    """Persistent SQLite index of image details keyed by path.
+    
+    Rows are grouped by directory so a scan can compare one directory's
+    stat data against the index with a single query. The index must only
+    be used from the thread that created it.
+    """
+    
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Open or create an index.
+        
+        Args:
+            path: Database file, ``None`` for the per-user cache location
+        """
+        self.path = path or get_default_index_path()
+        self._connection = sqlite3.connect(self.path)
+        # The index is only a cache, so tables of an older layout are dropped
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != _INDEX_VERSION:
+            for table in _TABLES:
+                self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self._connection.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, directory TEXT NOT NULL, format TEXT, mode TEXT, "
+            "width INTEGER, height INTEGER, orientation INTEGER, has_exif INTEGER, "
+            "has_icc INTEGER, has_xmp INTEGER, frames INTEGER, mtime_ns INTEGER, "
+            "file_size INTEGER, hash TEXT)"
+        )
+        # Files that could not be read, so unchanged ones are not opened again
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS failures ("
+            "path TEXT PRIMARY KEY, directory TEXT NOT NULL, mtime_ns INTEGER, "
+            "file_size INTEGER)"
+        )
+        for table in _TABLES:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_directory ON {table} (directory)"
+            )
+    
+    def __enter__(self) -> "ProbeIndex":
+        """Use the index as a context manager that closes it on exit."""
+        return self
+    
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the index."""
+        self.close()
+    
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        self._connection.commit()
+        self._connection.close()
+    
+    def get(self, path: str) -> Optional[ImageInfo]:
+        """Look up the stored result for a file.
+        
+        Args:
+            path: Absolute path of the file
+        
+        Returns:
+            The stored result, or None if the file is not indexed.
+        """
+        row = self._connection.execute(
+            f"SELECT {_COLUMNS} FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return _from_row(row) if row else None
+    
+    def get_directory(self, directory: str) -> Dict[str, ImageInfo]:
+        """Get all stored results directly inside a directory.
+        
+        Args:
+            directory: Absolute path of the directory
+        
+        Returns:
+            Stored results keyed by path.
+        """
+        rows = self._connection.execute(
+            f"SELECT {_COLUMNS} FROM files WHERE directory = ?", (directory,)
+        )
+        return {row[0]: _from_row(row) for row in rows}
+    
+    def get_failures(self, directory: str) -> Dict[str, Tuple[int, int]]:
+        """Get the unreadable files directly inside a directory.
+        
+        Args:
+            directory: Absolute path of the directory
+        
+        Returns:
+            The modification time and size each file had when it failed,
+            keyed by path.
+        """
+        rows = self._connection.execute(
+            "SELECT path, mtime_ns, file_size FROM failures WHERE directory = ?", (directory,)
+        )
+        return {path: (mtime_ns, file_size) for path, mtime_ns, file_size in rows}
+    
+    def update(self, results: Iterable[ImageInfo]) -> None:
+        """Insert or replace results.
+        
+        Args:
+            results: Image details to store
+        """
+        results = list(results)
+        self._connection.executemany(
+            "DELETE FROM failures WHERE path = ?", ((result.path,) for result in results)
+        )
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO files (directory, {_COLUMNS}) "
+            f"VALUES (?, {', '.join('?' * len(_FIELDS))})",
+            ((os.path.dirname(result.path),) + astuple(result) for result in results)
+        )
+    
+    def mark_failed(self, failures: Iterable[Tuple[str, int, int]]) -> None:
+        """Record files that could not be read, replacing any stored details.
+        
+        Args:
+            failures: Path, modification time and size of each file
+        """
+        failures = list(failures)
+        self._connection.executemany(
+            "DELETE FROM files WHERE path = ?", ((path,) for path, _, _ in failures)
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO failures (directory, path, mtime_ns, file_size) "
+            "VALUES (?, ?, ?, ?)",
+            ((os.path.dirname(path), path, mtime_ns, file_size) for path, mtime_ns, file_size in failures)
+        )
+    
+    def remove(self, paths: Iterable[str]) -> None:
+        """Remove files from the index.
+        
+        Args:
+            paths: Absolute paths of the files
+        """
+        paths = list(paths)
+        for table in _TABLES:
+            self._connection.executemany(
+                f"DELETE FROM {table} WHERE path = ?", ((path,) for path in paths)
+            )
+    
+    def remove_directories_except(self, root: str, keep: Set[str]) -> None:
+        """Remove rows below ``root`` whose directory is not in ``keep``.
+        
+        Args:
+            root: Absolute path of the scanned root directory
+            keep: Directories that still exist
+        """
+        prefix = os.path.join(root, "")
+        for table in _TABLES:
+            rows = self._connection.execute(
+                f"SELECT DISTINCT directory FROM {table} "
+                "WHERE directory = ? OR substr(directory, 1, ?) = ?",
+                (root, len(prefix), prefix)
+            ).fetchall()
+            self._connection.executemany(
+                f"DELETE FROM {table} WHERE directory = ?",
+                ((directory,) for (directory,) in rows if directory not in keep)
+            )
+
+
+def get_default_index_path() -> str:
+    """Get the path of the per-user probe index.
+    
+    Returns:
+        The full path to the index database.
+    
+    Raises:
+        ConfigError: If the cache directory cannot be created.
+    """
+    try:
+        cache_dir = appdirs.user_cache_dir(APP_NAME, COMPANY_NAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, PROBE_INDEX_FILENAME)
+    except Exception as e:
+        raise ConfigError(f"Could not create cache directory: {e}")
+
+
+def _scan_one_directory(
+    directory: str,
+    recursive: bool
+) -> Tuple[str, List[Tuple[str, os.stat_result]], List[str]]:
+    """List the image files and subdirectories of one directory.
+    
+    Args:
+        directory: Absolute path of the directory
+        recursive: Whether subdirectories are returned
+    
+    Returns:
+        The directory, its image files with stat data, and its subdirectories.
+    """
+    files: List[Tuple[str, os.stat_result]] = []
+    subdirectories: List[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            subdirectories.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                        files.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return directory, files, subdirectories
+
+
+def _safe_probe(path: str, stat: os.stat_result, hash_files: bool) -> Optional[ImageInfo]:
+    """Read a file's header, returning None if it cannot be read as an image."""
+    try:
+        return read_image_info(path, stat, hash_files)
+    except Exception:
+        return None
+
+
+def scan_directory(
+    root: str,
+    recursive: bool = True,
+    index: Optional[ProbeIndex] = None,
+    hash_files: bool = False,
+    max_workers: Optional[int] = None
+) -> List[ImageInfo]:
+    """Probe every image below a directory in parallel.
+    
+    Directories are listed and files probed on a thread pool. With an index,
+    files whose mtime and size match the stored row are taken from the index
+    without being opened, so a repeat scan of an unchanged tree only costs
+    the stat calls. Unreadable files are recorded too and are not opened
+    again until their mtime or size changes. The index is updated with
+    new, changed, unreadable and removed files.
+    
+    Args:
+        root: Directory to scan
+        recursive: Also scan subdirectories
+        index: Optional persistent index to reuse and update
+        hash_files: Hash the contents of new or changed files
+        max_workers: Number of worker threads, ``None`` for the default
+    
+    Returns:
+        Image details for all readable images, sorted by path.
+    """
+    root = os.path.abspath(root)
+    results: List[ImageInfo] = []
+    visited: Set[str] = set()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        listings: Set[Future] = {executor.submit(_scan_one_directory, root, recursive)}
+        probes: List[Tuple[Future, str, os.stat_result]] = []
+        
+        while listings:
+            done, listings = wait(listings, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory, files, subdirectories = future.result()
+                visited.add(directory)
+                for subdirectory in subdirectories:
+                    listings.add(executor.submit(_scan_one_directory, subdirectory, recursive))
+                
+                known = index.get_directory(directory) if index else {}
+                failed = index.get_failures(directory) if index else {}
+                for path, stat in files:
+                    cached = known.pop(path, None)
+                    failure = failed.pop(path, None)
+                    if (cached and cached.mtime_ns == stat.st_mtime_ns
+                            and cached.file_size == stat.st_size
+                            and (cached.hash or not hash_files)):
+                        results.append(cached)
+                    elif failure != (stat.st_mtime_ns, stat.st_size):
+                        probes.append((executor.submit(_safe_probe, path, stat, hash_files), path, stat))
+                if index and (known or failed):
+                    index.remove(list(known) + list(failed))
+        
+        probed: List[ImageInfo] = []
+        unreadable: List[Tuple[str, int, int]] = []
+        for future, path, stat in probes:
+            result = future.result()
+            if result:
+                probed.append(result)
+            else:
+                unreadable.append((path, stat.st_mtime_ns, stat.st_size))
+    
+    if index is not None:
+        index.update(probed)
+        index.mark_failed(unreadable)
+        if recursive:
+            index.remove_directories_except(root, visited)
+    
+    results.extend(probed)
+    results.sort(key=lambda result: result.path)
+    return results
@@ -0,0 +1,239 @@
+"""Palette quantization and dithering for GIF and PNG-8 output."""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..constants import (
+    KMEANS_ITERATIONS,
+    KMEANS_SAMPLE_PIXELS,
+    PALETTE_CACHE_SIZE,
+    QUANTIZE_SAMPLE_SIZE
+)
+
+# Quantizer choices as (label, value) pairs
+MEDIAN_CUT = "mediancut"
+OCTREE = "octree"
+KMEANS = "kmeans"
+QUANTIZERS: Tuple[Tuple[str, str], ...] = (
+    ("Median cut", MEDIAN_CUT),
+    ("Octree", OCTREE),
+    ("K-means", KMEANS)
+)
+
+# Alpha values below this become the transparent palette entry
+_ALPHA_THRESHOLD = 128
+
+
+def has_alpha(image: Image.Image) -> bool:
+    """Check whether an image carries transparency.
+    
+    Args:
+        image: The image to check
+    
+    Returns:
+        True if the image has an alpha channel or a transparency key.
+    """
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _sample_image(image: Image.Image) -> Image.Image:
+    """Shrink an image to the RGB sample the palette is built from.
+    
+    Args:
+        image: The source image
+    
+    Returns:
+        A small RGB image.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if has_alpha(image) else "RGB")
+    factor = max(image.width, image.height) // QUANTIZE_SAMPLE_SIZE
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def _kmeans_palette(sample: Image.Image, colors: int) -> List[int]:
+    """Build a palette with k-means on a random subsample of pixels.
+    
+    Centers start from a median cut palette and are refined with a few
+    vectorized Lloyd iterations.
+    
+    Args:
+        sample: Small RGB image to sample pixels from
+        colors: Number of palette entries
+    
+    Returns:
+        A flat ``[r, g, b, ...]`` palette.
+    """
+    pixels = np.asarray(sample, dtype=np.float32).reshape(-1, 3)
+    if len(pixels) > KMEANS_SAMPLE_PIXELS:
+        rng = np.random.default_rng(0)
+        pixels = pixels[rng.choice(len(pixels), KMEANS_SAMPLE_PIXELS, replace=False)]
+    
+    initial = sample.quantize(colors, method=Image.Quantize.MEDIANCUT)
+    centers = np.array(initial.getpalette("RGB"), dtype=np.float32).reshape(-1, 3)
+    pixel_norms = (pixels * pixels).sum(axis=1, keepdims=True)
+    
+    for _ in range(KMEANS_ITERATIONS):
+        distances = (
+            pixel_norms
+            - 2 * pixels @ centers.T
+            + (centers * centers).sum(axis=1)
+        )
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        used = counts > 0
+        for channel in range(3):
+            sums = np.bincount(labels, weights=pixels[:, channel], minlength=len(centers))
+            centers[used, channel] = sums[used] / counts[used]
+    
+    return np.clip(np.rint(centers), 0, 255).astype(np.uint8).ravel().tolist()
+
+
+def build_palette(image: Image.Image, colors: int, quantizer: str = MEDIAN_CUT) -> Image.Image:
+    """Build a palette for an image from a downscaled sample.
+    
+    For images with transparency one entry is left free for the
+    transparent color.
+    
+    Args:
+        image: The source image
+        colors: Total number of palette entries (2-256)
+        quantizer: One of ``MEDIAN_CUT``, ``OCTREE`` or ``KMEANS``
+    
+    Returns:
+        A 1x1 ``P`` image holding the palette, for ``Image.quantize(palette=...)``.
+    """
+    sample = _sample_image(image)
+    entries = max(1, colors - 1) if has_alpha(image) else colors
+    
+    if quantizer == KMEANS:
+        palette = _kmeans_palette(sample, entries)
+    else:
+        method = Image.Quantize.FASTOCTREE if quantizer == OCTREE else Image.Quantize.MEDIANCUT
+        palette = sample.quantize(entries, method=method).getpalette("RGB")
+    
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(palette[:entries * 3])
+    return palette_image
+
+
+def quantize_image(image: Image.Image, palette: Image.Image, dither: bool = True) -> Image.Image:
+    """Map an image onto a palette.
+    
+    This is the only full-raster pass of the quantization stage. Pixels
+    that are mostly transparent are set to an extra, transparent entry.
+    
+    Args:
+        image: The source image
+        palette: Palette image from ``build_palette``
+        dither: Use Floyd-Steinberg dithering
+    
+    Returns:
+        The ``P`` mode image.
+    """
+    alpha = None
+    if has_alpha(image):
+        rgba = image if image.mode == "RGBA" else image.convert("RGBA")
+        alpha = rgba.getchannel("A")
+        rgb = rgba.convert("RGB")
+    else:
+        rgb = image if image.mode in ("RGB", "L") else image.convert("RGB")
+    if rgb.mode == "L":
+        rgb = rgb.convert("RGB")
+    
+    quantized = rgb.quantize(
+        palette=palette,
+        dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+    )
+    
+    if alpha is not None:
+        entries = palette.getpalette("RGB")
+        transparent_index = len(entries) // 3
+        quantized.putpalette(entries + [0, 0, 0])
+        mask = alpha.point(lambda value: 255 if value < _ALPHA_THRESHOLD else 0)
+        quantized.paste(transparent_index, mask=mask)
+        quantized.info["transparency"] = transparent_index
+    return quantized
+
+
+class PaletteCache:
+    """Small LRU cache of palettes per source image.
+    
+    Entries are keyed by the identity of the image object and only hold a
+    weak reference to it, so a cached palette is reused exactly as long as
+    the same image object is being converted. The cache may be shared
+    between threads.
+    """
+    
+    def __init__(self, max_entries: int = PALETTE_CACHE_SIZE) -> None:
+        """Create an empty cache.
+        
+        Args:
+            max_entries: Number of palettes kept
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[weakref.ref, Image.Image]]" = OrderedDict()
+    
+    def clear(self) -> None:
+        """Drop all cached palettes."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_palette(self, image: Image.Image, colors: int, quantizer: str) -> Image.Image:
+        """Get the palette for an image, building it on first use.
+        
+        Args:
+            image: The source image
+            colors: Number of palette entries
+            quantizer: Quantizer name
+        
+        Returns:
+            The palette image.
+        """
+        key = (id(image), colors, quantizer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is image:
+                self._entries.move_to_end(key)
+                return entry[1]
+        
+        palette = build_palette(image, colors, quantizer)
+        with self._lock:
+            self._entries[key] = (weakref.ref(image), palette)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return palette
+
+
+def to_palette_image(
+    image: Image.Image,
+    colors: int,
+    quantizer: str = MEDIAN_CUT,
+    dither: bool = True,
+    cache: Optional[PaletteCache] = None
+) -> Image.Image:
+    """Quantize an image, reusing a cached palette when possible.
+    
+    Args:
+        image: The source image
+        colors: Number of palette entries
+        quantizer: Quantizer name
+        dither: Use Floyd-Steinberg dithering
+        cache: Optional palette cache
+    
+    Returns:
+        The ``P`` mode image.
+    """
+    palette = (
+        cache.get_palette(image, colors, quantizer)
+        if cache is not None
+        else build_palette(image, colors, quantizer)
+    )
+    return quantize_image(image, palette, dither)
@@ -0,0 +1,396 @@
+"""Compact conversion queue for large multi-file workflows."""
+import os
+import threading
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..constants import DEFAULT_AUTO_QUALITY_TARGET, FORMATS, QUEUE_JOBS_PER_WORKER
+from .batch import ConversionResult, convert_file, get_output_path
+from .metadata import MetadataOptions
+from .probe import ImageInfo
+from .resize import ResizeOptions
+
+# Entry states
+PENDING = 0
+RUNNING = 1
+DONE = 2
+FAILED = 3
+STATUS_LABELS: Tuple[str, ...] = ("Pending", "Converting", "Done", "Failed")
+
+# Column value for sizes, qualities and scores that are not known
+UNKNOWN = -1
+
+
+class QueueEntry:
+    """Snapshot of one queue entry, built on access.
+    
+    The queue itself stores no per-entry objects; this record only exists
+    while the caller holds it.
+    
+    Attributes:
+        index: Position in the queue
+        path: Path of the input file
+        status: One of ``PENDING``, ``RUNNING``, ``DONE`` or ``FAILED``
+        width: Source width in pixels, 0 if not known yet
+        height: Source height in pixels, 0 if not known yet
+        source_bytes: Size of the input file, ``UNKNOWN`` if not known yet
+        output_bytes: Size of the written file, ``UNKNOWN`` until converted
+        elapsed: Conversion time in seconds
+        quality: Quality used, ``UNKNOWN`` for formats without quality
+        score: SSIM reached when auto quality chose the quality, else ``UNKNOWN``
+        error: Error message if the conversion failed
+    """
+    __slots__ = (
+        "index",
+        "path",
+        "status",
+        "width",
+        "height",
+        "source_bytes",
+        "output_bytes",
+        "elapsed",
+        "quality",
+        "score",
+        "error"
+    )
+    
+    def __init__(
+        self,
+        index: int,
+        path: str,
+        status: int,
+        width: int,
+        height: int,
+        source_bytes: int,
+        output_bytes: int,
+        elapsed: float,
+        quality: int,
+        score: float,
+        error: Optional[str]
+    ) -> None:
+        self.index = index
+        self.path = path
+        self.status = status
+        self.width = width
+        self.height = height
+        self.source_bytes = source_bytes
+        self.output_bytes = output_bytes
+        self.elapsed = elapsed
+        self.quality = quality
+        self.score = score
+        self.error = error
+    
+    def __repr__(self) -> str:
+        return (
+            f"QueueEntry(index={self.index}, path={self.path!r}, "
+            f"status={STATUS_LABELS[self.status]})"
+        )
+
+
+class ConversionQueue:
+    """Queue of files to convert, stored as typed array columns.
+    
+    Each entry costs a few dozen bytes plus its file name: directories are
+    interned, numeric state lives in ``array`` columns and error messages are
+    kept sparsely. No ``PIL.Image`` is held once a job finishes, so the queue
+    can hold hundreds of thousands of files.
+    
+    Attributes:
+        bytes_saved: Total bytes saved by the PNG optimizer so far
+    
+    Entries may be read from other threads while ``run`` is converting,
+    and files may be added from several threads at once.
+    """
+    
+    def __init__(self) -> None:
+        """Create an empty queue."""
+        self._stop = threading.Event()
+        self._running = False
+        # Guards appends to the columns and the state counts
+        self._lock = threading.Lock()
+        self.clear()
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def __getitem__(self, index: int) -> QueueEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("queue index out of range")
+        return QueueEntry(
+            index,
+            self.path(index),
+            self._status[index],
+            self._width[index],
+            self._height[index],
+            self._source_bytes[index],
+            self._output_bytes[index],
+            self._elapsed[index],
+            self._quality[index],
+            self._score[index],
+            self._errors.get(index)
+        )
+    
+    @property
+    def running(self) -> bool:
+        """Whether ``run`` is currently converting entries."""
+        return self._running
+    
+    def path(self, index: int) -> str:
+        """Get the path of an entry.
+        
+        Args:
+            index: Position in the queue
+        
+        Returns:
+            The input file path.
+        """
+        return os.path.join(
+            self._directories[self._directory_column[index]],
+            self._names[index]
+        )
+    
+    def status(self, index: int) -> int:
+        """Get the state of an entry.
+        
+        Args:
+            index: Position in the queue
+        
+        Returns:
+            One of ``PENDING``, ``RUNNING``, ``DONE`` or ``FAILED``.
+        """
+        return self._status[index]
+    
+    def counts(self) -> Tuple[int, ...]:
+        """Count the entries in each state.
+        
+        Returns:
+            The number of entries per state, indexed like ``STATUS_LABELS``.
+        """
+        return tuple(self._counts)
+    
+    def add(
+        self,
+        path: str,
+        width: int = 0,
+        height: int = 0,
+        source_bytes: int = UNKNOWN
+    ) -> int:
+        """Append a file to the queue.
+        
+        Args:
+            path: Path of the input file
+            width: Source width if already known
+            height: Source height if already known
+            source_bytes: Size of the input file if already known
+        
+        Returns:
+            The index of the new entry.
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            directory_id = self._directory_ids.get(directory)
+            if directory_id is None:
+                directory_id = self._directory_ids[directory] = len(self._directories)
+                self._directories.append(directory)
+            
+            self._directory_column.append(directory_id)
+            self._status.append(PENDING)
+            self._width.append(width)
+            self._height.append(height)
+            self._source_bytes.append(source_bytes)
+            self._output_bytes.append(UNKNOWN)
+            self._elapsed.append(0.0)
+            self._quality.append(UNKNOWN)
+            self._score.append(UNKNOWN)
+            self._counts[PENDING] += 1
+            # Append the name last so readers on other threads never see a partial entry
+            self._names.append(name)
+            return len(self._names) - 1
+    
+    def extend(self, paths: Iterable[str]) -> int:
+        """Append many files to the queue.
+        
+        Args:
+            paths: Paths of the input files
+        
+        Returns:
+            The number of entries added.
+        """
+        added = 0
+        for path in paths:
+            self.add(path)
+            added += 1
+        return added
+    
+    def extend_probed(self, results: Iterable[ImageInfo]) -> int:
+        """Append files from ``scan_directory``, keeping their header details.
+        
+        Args:
+            results: Header details of the input files
+        
+        Returns:
+            The number of entries added.
+        """
+        added = 0
+        for result in results:
+            self.add(result.path, result.width, result.height, result.file_size)
+            added += 1
+        return added
+    
+    def clear(self) -> None:
+        """Remove all entries.
+        
+        Raises:
+            RuntimeError: If the queue is being converted.
+        """
+        if self._running:
+            raise RuntimeError("Cannot clear a queue while it is running")
+        self._directories: List[str] = []
+        self._directory_ids: Dict[str, int] = {}
+        self._directory_column = array("I")
+        self._names: List[str] = []
+        self._status = array("B")
+        self._width = array("I")
+        self._height = array("I")
+        self._source_bytes = array("q")
+        self._output_bytes = array("q")
+        self._elapsed = array("f")
+        self._quality = array("b")
+        self._score = array("f")
+        self._errors: Dict[int, str] = {}
+        self._counts = [0] * len(STATUS_LABELS)
+        self.bytes_saved = 0
+    
+    def reset_failed(self) -> None:
+        """Mark failed entries as pending again so the next run retries them."""
+        for index in list(self._errors):
+            if self._status[index] == FAILED:
+                self._set_status(index, PENDING)
+        self._errors.clear()
+    
+    def stop(self) -> None:
+        """Ask a running ``run`` to stop after the jobs already started."""
+        self._stop.set()
+    
+    def record(self, index: int, result: ConversionResult) -> None:
+        """Store the outcome of a conversion in the queue columns.
+        
+        Only scalar fields are copied; the result object can be dropped.
+        
+        Args:
+            index: Position in the queue
+            result: Result of converting the entry
+        """
+        if result.width is not None:
+            self._width[index] = result.width
+            self._height[index] = result.height
+        if result.size_bytes is not None:
+            self._output_bytes[index] = result.size_bytes
+        if result.elapsed is not None:
+            self._elapsed[index] = result.elapsed
+        if result.quality is not None:
+            self._quality[index] = result.quality
+        if result.score is not None:
+            self._score[index] = result.score
+        if result.bytes_saved:
+            self.bytes_saved += result.bytes_saved
+        if result.ok:
+            self._errors.pop(index, None)
+            self._set_status(index, DONE)
+        else:
+            self._errors[index] = result.error
+            self._set_status(index, FAILED)
+    
+    def run(
+        self,
+        output_dir: str,
+        format_name: str,
+        settings: Optional[Mapping[str, Any]] = None,
+        auto_quality: bool = False,
+        target: float = DEFAULT_AUTO_QUALITY_TARGET,
+        resize: Optional[ResizeOptions] = None,
+        metadata: Optional[MetadataOptions] = None,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> Tuple[int, ...]:
+        """Convert all pending entries in parallel.
+        
+        Only a few jobs per worker are in flight at a time, so memory stays
+        flat however long the queue is. Entries added while running are
+        picked up by the same run.
+        
+        Args:
+            output_dir: Directory the converted files are written to
+            format_name: Target format name
+            settings: Encoder option values, missing ones use the defaults
+            auto_quality: Pick the quality per file from ``target``
+            target: SSIM target used by auto quality
+            resize: Optional resize applied to every file before encoding
+            metadata: Metadata options, ``None`` for the defaults
+            max_workers: Number of worker threads, ``None`` for the default
+            on_progress: Called with the index of each finished entry, on
+                the thread running the queue
+        
+        Returns:
+            The state counts after the run, as returned by ``counts``.
+        
+        Raises:
+            ValueError: If the format is not supported.
+            RuntimeError: If the queue is already running.
+        """
+        if format_name not in FORMATS:
+            raise ValueError(f"Unsupported format: {format_name}")
+        if self._running:
+            raise RuntimeError("Queue is already running")
+        os.makedirs(output_dir, exist_ok=True)
+        self._stop.clear()
+        self._running = True
+        
+        def job(index: int) -> ConversionResult:
+            source_path = self.path(index)
+            return convert_file(
+                source_path,
+                get_output_path(source_path, output_dir, format_name),
+                format_name,
+                settings,
+                auto_quality,
+                target,
+                resize,
+                metadata
+            )
+        
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                limit = workers * QUEUE_JOBS_PER_WORKER
+                in_flight: Dict[Future, int] = {}
+                next_index = 0
+                while True:
+                    while (len(in_flight) < limit and next_index < len(self)
+                            and not self._stop.is_set()):
+                        if self._status[next_index] == PENDING:
+                            self._set_status(next_index, RUNNING)
+                            in_flight[executor.submit(job, next_index)] = next_index
+                        next_index += 1
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = in_flight.pop(future)
+                        self.record(index, future.result())
+                        if on_progress:
+                            on_progress(index)
+        finally:
+            self._running = False
+        return self.counts()
+    
+    def _set_status(self, index: int, status: int) -> None:
+        """Change the state of an entry, keeping the counts in sync."""
+        with self._lock:
+            self._counts[self._status[index]] -= 1
+            self._counts[status] += 1
+            self._status[index] = status
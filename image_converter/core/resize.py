@@ -0,0 +1,103 @@
+"""Resize stage applied before encoding."""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from ..constants import RESIZE_REDUCING_GAP
+
+# Modes that Image.reduce() cannot handle and that are converted first
+_UNREDUCIBLE_MODES = ("1", "P")
+
+# 16-bit modes that Image.reduce() rejects; they go straight to the final filter
+_UNREDUCIBLE_16BIT_PREFIX = "I;16"
+
+
+@dataclass(frozen=True)
+class ResizeOptions:
+    """Requested output size.
+    
+    Attributes:
+        max_dimension: Longest side of the output; images are never enlarged
+        scale: Scale factor applied to both sides (e.g. 0.5 for half size)
+    """
+    max_dimension: Optional[int] = None
+    scale: Optional[float] = None
+    
+    @property
+    def active(self) -> bool:
+        """Whether these options change the image size at all."""
+        return self.max_dimension is not None or self.scale is not None
+    
+    def target_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Compute the output size for an image.
+        
+        Args:
+            width: Source width
+            height: Source height
+        
+        Returns:
+            The output ``(width, height)``, at least 1x1.
+        """
+        if self.max_dimension is not None:
+            factor = min(1.0, self.max_dimension / max(width, height))
+        elif self.scale is not None:
+            factor = self.scale
+        else:
+            return width, height
+        return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+def draft_for_resize(image: Image.Image, options: Optional[ResizeOptions]) -> None:
+    """Ask the decoder to load an unloaded JPEG at a reduced scale.
+    
+    JPEG can decode at 1/2, 1/4 or 1/8 scale for a fraction of the cost of a
+    full decode. The draft size keeps ``RESIZE_REDUCING_GAP`` headroom so the
+    final filter still has enough detail to work with.
+    
+    Args:
+        image: A freshly opened, not yet loaded image
+        options: Resize options, or ``None`` to do nothing
+    """
+    if not options or not options.active or image.format != "JPEG":
+        return
+    width, height = options.target_size(image.width, image.height)
+    image.draft(
+        image.mode,
+        (width * RESIZE_REDUCING_GAP, height * RESIZE_REDUCING_GAP)
+    )
+
+
+def resize_image(
+    image: Image.Image,
+    options: Optional[ResizeOptions],
+    source_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """Resize an image, prescaling by an integer factor with ``reduce()``.
+    
+    ``reduce()`` averages whole pixel blocks and is much cheaper than a
+    LANCZOS pass over the full raster, so only the last step uses LANCZOS.
+    16-bit images skip the prescale, which ``reduce()`` does not support.
+    
+    Args:
+        image: The source image
+        options: Resize options, or ``None`` to return the image unchanged
+        source_size: Size of the image before ``draft_for_resize``, so that
+            scale factors refer to the original rather than the drafted size
+    
+    Returns:
+        The resized image, or the source image if the size does not change.
+    """
+    if not options or not options.active:
+        return image
+    size = options.target_size(*(source_size or image.size))
+    if size == image.size:
+        return image
+    
+    if image.mode in _UNREDUCIBLE_MODES:
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    
+    factor = min(image.width // size[0], image.height // size[1]) // RESIZE_REDUCING_GAP
+    if factor > 1 and not image.mode.startswith(_UNREDUCIBLE_16BIT_PREFIX):
+        image = image.reduce(factor)
+    return image.resize(size, Image.Resampling.LANCZOS)
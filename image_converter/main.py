@@ -4,10 +4,11 @@ import json
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinterdnd2 import TkinterDnD
-from PIL import Image, ImageTk
+from PIL import Image
 import io
+import threading
 import appdirs
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Hashable
 
 from .constants import (
     COLORS,
@@ -16,11 +17,40 @@ from .constants import (
     DEFAULT_QUALITY,
     MIN_QUALITY,
     MAX_QUALITY,
+    DEFAULT_AUTO_QUALITY_TARGET,
+    RESIZE_MODES,
+    DEFAULT_MAX_DIMENSION,
+    DEFAULT_RESIZE_SCALE,
     COMPANY_NAME,
     APP_NAME,
     BYTES_PER_KB,
-    BYTES_PER_MB
+    BYTES_PER_MB,
+    ESTIMATE_POLL_MS,
+    QUEUE_REFRESH_MS
 )
+from .core import (
+    ConversionQueue,
+    ImageInfo,
+    MetadataOptions,
+    ProbeIndex,
+    ResizeOptions,
+    encode_image,
+    encode_region,
+    find_auto_quality,
+    get_default_settings,
+    get_encoder_options,
+    get_metadata_kwargs,
+    normalize_settings,
+    read_image_info,
+    render_image,
+    scan_directory,
+    settings_key,
+    supports_option
+)
+from .core.png_optimizer import PngOptimizationResult
+from .core.quantize import PaletteCache
+from .core.queue import DONE, FAILED, PENDING, STATUS_LABELS, UNKNOWN
+from .core.encoders import CHOICE_OPTION
 from .ui import UISetupMixin
 from .utils.exceptions import ImageLoadError, ImageSaveError, ConfigError
 
@@ -62,8 +92,63 @@ class ImageFormatConverter(UISetupMixin):
         self.source_filename: Optional[str] = None
         self.source_path: Optional[str] = None
         self.quality_var = tk.IntVar(value=DEFAULT_QUALITY)
+        self.auto_quality_var = tk.BooleanVar(value=False)
+        self.auto_quality_result_var = tk.StringVar(value="")
         self.format_var = tk.StringVar(value="JPEG")
         self.file_size_var = tk.StringVar(value="No file selected")
+        self.resize_mode_var = tk.StringVar(value=RESIZE_MODES[0])
+        self.resize_value_var = tk.StringVar(value=str(DEFAULT_MAX_DIMENSION))
+        self.output_size_var = tk.StringVar(value="")
+        self.image_info_var = tk.StringVar(value="")
+        
+        # Metadata options
+        defaults = MetadataOptions()
+        self.apply_orientation_var = tk.BooleanVar(value=defaults.apply_orientation)
+        self.keep_exif_var = tk.BooleanVar(value=defaults.keep_exif)
+        self.keep_icc_var = tk.BooleanVar(value=defaults.keep_icc)
+        self.keep_xmp_var = tk.BooleanVar(value=defaults.keep_xmp)
+        self.convert_srgb_var = tk.BooleanVar(value=defaults.convert_to_srgb)
+        
+        # Encoder settings per format; the quality itself lives in quality_var
+        self.encoder_settings: Dict[str, Dict[str, Any]] = {
+            format_name: get_default_settings(format_name) for format_name in FORMATS
+        }
+        self.encoder_vars: Dict[str, tk.Variable] = {}
+        self.encoder_options_format: Optional[str] = None
+        
+        # Palettes for GIF/PNG-8 output, reused between estimates and the final save
+        self.palette_cache = PaletteCache()
+        
+        # Estimated output sizes and PNG optimizer savings keyed by every option that affects them
+        self._size_estimate_cache: Dict[Hashable, Tuple[int, Optional[int]]] = {}
+        
+        # Deep PNG optimization runs off the Tk thread; the last result is
+        # kept so saving with the same options writes it without a new search
+        self._estimate_worker: Optional[threading.Thread] = None
+        self._estimate_outcome: Optional[
+            Tuple[Hashable, Image.Image, Optional[int], Optional[PngOptimizationResult]]
+        ] = None
+        self._png_result: Optional[Tuple[Hashable, PngOptimizationResult]] = None
+        # Save waiting for that result, as (file path, size estimate key)
+        self._pending_save: Optional[Tuple[str, Hashable]] = None
+        
+        # Header-only details of the source file
+        self.source_info: Optional[ImageInfo] = None
+        
+        # Processed copy of the source image, keyed by the resize and metadata options
+        self._output_image_cache: Optional[
+            Tuple[Tuple[Optional[ResizeOptions], MetadataOptions], Image.Image]
+        ] = None
+        
+        # Last preview comparison region, keyed by the settings, region and output options
+        self._comparison_cache: Optional[Tuple[Hashable, Image.Image]] = None
+        
+        # Batch queue; the window and its worker thread are created on demand
+        self.queue = ConversionQueue()
+        self.queue_status_var = tk.StringVar(value="Queue is empty")
+        self.queue_window: Optional[tk.Toplevel] = None
+        self._queue_worker: Optional[threading.Thread] = None
+        self._queue_error: Optional[str] = None
         
         # Store supported formats
         self.formats = FORMATS
@@ -138,6 +223,7 @@ class ImageFormatConverter(UISetupMixin):
     
     def on_closing(self) -> None:
         """Handle window closing event."""
+        self.queue.stop()
         self.save_config()
         self.root.destroy()
     
@@ -153,36 +239,25 @@ class ImageFormatConverter(UISetupMixin):
         """
         try:
             if not reloading:
+                self.source_info = read_image_info(file_path)
+                self.image_info_var.set(self._format_image_info(self.source_info))
                 self.source_image = Image.open(file_path)
                 self.source_path = file_path
                 self.source_filename = os.path.splitext(os.path.basename(file_path))[0]
+                self._output_image_cache = None
+                self._comparison_cache = None
+                self._size_estimate_cache.clear()
+                self._png_result = None
+                self._pending_save = None
+                self.palette_cache.clear()
             
-            container_width = self.drop_container.winfo_width()
-            container_height = self.drop_container.winfo_height()
-            
-            if container_width > 0 and container_height > 0:
-                # Calculate aspect ratio
-                img_ratio = self.source_image.width / self.source_image.height
-                container_ratio = container_width / container_height
-                
-                if img_ratio > container_ratio:
-                    new_width = container_width
-                    new_height = int(container_width / img_ratio)
-                else:
-                    new_height = container_height
-                    new_width = int(container_height * img_ratio)
-                
-                # Resize image maintaining aspect ratio
-                preview_image = self.source_image.copy()
-                preview_image.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                photo = ImageTk.PhotoImage(preview_image)
-                self.drop_area.configure(image=photo, text="")
-                self.drop_area.image = photo
+            # Swap the drop prompt for the pan/zoom preview
+            self.drop_area.grid_remove()
+            self.preview.grid()
             
             self.convert_button.configure(state="normal")
             self.update_file_size_preview()
-            self.on_format_change()
+            self.on_resize_change()
             
         except Exception as e:
             raise ImageLoadError(f"Could not load image: {e}")
@@ -196,13 +271,6 @@ class ImageFormatConverter(UISetupMixin):
         try:
             format_name = self.format_var.get()
             
-            # Convert image
-            converted_image = (
-                self.source_image.convert('RGB')
-                if format_name == "JPEG"
-                else self.source_image.copy()
-            )
-            
             # Get file extension and prepare save dialog
             extensions = self.formats[format_name]
             default_ext = extensions[0]
@@ -231,16 +299,26 @@ class ImageFormatConverter(UISetupMixin):
             
             if file_path:
                 # Save with appropriate settings
-                save_kwargs = {}
-                if format_name in ["JPEG", "WEBP"]:
-                    save_kwargs["quality"] = self.quality_var.get()
-                
                 try:
-                    converted_image.save(
-                        file_path,
-                        format=format_name,
-                        **save_kwargs
-                    )
+                    key = self.get_size_estimate_key()
+                    if (self._png_result is not None and self._png_result[0] == key) or (
+                            format_name == "PNG" and self.get_encoder_settings().get("deep_optimize")):
+                        # Deep PNG optimization takes seconds; reuse the background run
+                        self._pending_save = (file_path, key)
+                        self.save_when_optimized()
+                    else:
+                        encode_image(
+                            self.get_output_image(),
+                            file_path,
+                            format_name,
+                            self.get_encoder_settings(),
+                            get_metadata_kwargs(
+                                self.source_image,
+                                format_name,
+                                self.get_metadata_options()
+                            ),
+                            self.palette_cache
+                        )
                 except (IOError, OSError) as e:
                     raise ImageSaveError(f"Could not save the image: {e}")
                 
@@ -252,39 +330,202 @@ class ImageFormatConverter(UISetupMixin):
                 f"An unexpected error occurred:\n{str(e)}"
             )
     
+    def save_when_optimized(self) -> None:
+        """Write the pending deep PNG save once the background optimizer has it.
+        
+        Starts the optimizer for the pending options if it is idle, so the
+        search never runs on the Tk thread. The save is dropped if the
+        options change before the result arrives.
+        """
+        if self._pending_save is None:
+            return
+        file_path, key = self._pending_save
+        
+        if self._png_result is not None and self._png_result[0] == key:
+            self._pending_save = None
+            self.convert_button.configure(state="normal")
+            try:
+                with open(file_path, "wb") as output_file:
+                    output_file.write(self._png_result[1].data)
+            except (IOError, OSError) as e:
+                messagebox.showerror("Save Error", f"Could not save the image: {e}")
+            return
+        
+        if key != self.get_size_estimate_key():
+            self._pending_save = None
+            self.convert_button.configure(state="normal")
+            messagebox.showerror(
+                "Save Error",
+                "The settings changed before the PNG optimizer finished. Please save again."
+            )
+            return
+        
+        self.convert_button.configure(state="disabled")
+        if self._estimate_worker is None:
+            format_name = self.format_var.get()
+            self.file_size_var.set("Optimizing PNG…")
+            self.start_estimate_worker(
+                key,
+                format_name,
+                self.get_encoder_settings(),
+                get_metadata_kwargs(self.source_image, format_name, self.get_metadata_options())
+            )
+    
+    def get_size_estimate_key(self) -> Hashable:
+        """Get the key of every option that affects the output file.
+        
+        Returns:
+            A hashable key for the current format, settings, resize and metadata.
+        """
+        format_name = self.format_var.get()
+        return (
+            settings_key(format_name, self.get_encoder_settings()),
+            self.get_resize_options(),
+            self.get_metadata_options()
+        )
+    
     def update_file_size_preview(self) -> None:
-        """Update the file size preview."""
+        """Update the file size preview.
+        
+        Deep PNG optimization takes seconds, so that estimate runs on a
+        background thread and the preview is filled in when it finishes.
+        """
         if not self.source_image:
             self.file_size_var.set("No file selected")
             return
         
         try:
-            temp_buffer = io.BytesIO()
             format_name = self.format_var.get()
+            settings = self.get_encoder_settings()
+            key = self.get_size_estimate_key()
             
-            save_kwargs = {}
-            if format_name in ["JPEG", "WEBP"]:
-                save_kwargs["quality"] = self.quality_var.get()
-            
-            if format_name == "JPEG":
-                self.source_image.convert('RGB').save(
-                    temp_buffer,
-                    format=format_name,
-                    **save_kwargs
-                )
-            else:
-                self.source_image.save(
-                    temp_buffer,
-                    format=format_name,
-                    **save_kwargs
+            estimate = self._size_estimate_cache.get(key)
+            if estimate is None:
+                metadata_kwargs = get_metadata_kwargs(
+                    self.source_image, format_name, self.get_metadata_options()
                 )
+                if format_name == "PNG" and settings.get("deep_optimize"):
+                    self.file_size_var.set("Optimizing PNG…")
+                    self.start_estimate_worker(key, format_name, settings, metadata_kwargs)
+                    estimate = None
+                else:
+                    temp_buffer = io.BytesIO()
+                    encode_image(
+                        self.get_output_image(),
+                        temp_buffer,
+                        format_name,
+                        settings,
+                        metadata_kwargs,
+                        self.palette_cache
+                    )
+                    estimate = (temp_buffer.tell(), None)
+                    self._size_estimate_cache[key] = estimate
             
-            size_bytes = temp_buffer.tell()
-            size_str = self._format_file_size(size_bytes)
-            self.file_size_var.set(size_str)
+            if estimate is not None:
+                size_bytes, bytes_saved = estimate
+                size_str = self._format_file_size(size_bytes)
+                if bytes_saved is not None:
+                    size_str += f" (optimizer saved {self._format_file_size(bytes_saved)})"
+                self.file_size_var.set(size_str)
             
         except Exception:
             self.file_size_var.set("Error calculating size")
+        
+        self.preview.refresh_comparison()
+    
+    def start_estimate_worker(
+        self,
+        key: Hashable,
+        format_name: str,
+        settings: Dict[str, Any],
+        metadata_kwargs: Dict[str, Any]
+    ) -> None:
+        """Run a size estimate on a background thread.
+        
+        Only one estimate runs at a time; when it finishes, ``poll_estimate``
+        starts the next one if the options changed in the meantime.
+        
+        Args:
+            key: Size estimate key of the options being estimated
+            format_name: Target format name
+            settings: Encoder option values
+            metadata_kwargs: Metadata arguments for ``Image.save``
+        """
+        if self._estimate_worker is not None:
+            return
+        image = self.get_output_image()
+        
+        def run() -> None:
+            try:
+                temp_buffer = io.BytesIO()
+                report = encode_image(
+                    image,
+                    temp_buffer,
+                    format_name,
+                    settings,
+                    metadata_kwargs,
+                    self.palette_cache
+                )
+                self._estimate_outcome = (key, image, temp_buffer.tell(), report)
+            except Exception:
+                self._estimate_outcome = (key, image, None, None)
+        
+        self._estimate_outcome = None
+        self._estimate_worker = threading.Thread(target=run, daemon=True)
+        self._estimate_worker.start()
+        self.root.after(ESTIMATE_POLL_MS, self.poll_estimate)
+    
+    def poll_estimate(self) -> None:
+        """Store the background estimate once it finishes and refresh the preview."""
+        if self._estimate_worker is not None and self._estimate_worker.is_alive():
+            self.root.after(ESTIMATE_POLL_MS, self.poll_estimate)
+            return
+        self._estimate_worker = None
+        
+        key, image, size_bytes, report = self._estimate_outcome
+        current = (
+            self._output_image_cache is not None
+            and self._output_image_cache[1] is image
+            and key == self.get_size_estimate_key()
+        )
+        if size_bytes is None:
+            if self._pending_save is not None and self._pending_save[1] == key:
+                self._pending_save = None
+                self.convert_button.configure(state="normal")
+                messagebox.showerror("Save Error", "Could not optimize the PNG")
+            if current:
+                self.file_size_var.set("Error calculating size")
+                return
+        elif self._output_image_cache is not None and self._output_image_cache[1] is image:
+            self._size_estimate_cache[key] = (size_bytes, report.bytes_saved if report else None)
+            if report is not None:
+                self._png_result = (key, report)
+        self.save_when_optimized()
+        self.update_file_size_preview()
+    
+    def preview_comparison(self, box: Tuple[int, int, int, int]) -> Optional[Image.Image]:
+        """Encode one region of the output image for the preview comparison.
+        
+        Only the region is encoded, so comparing stays fast on large images.
+        The last result is cached for redraws that do not move the view.
+        
+        Args:
+            box: Region of the output image to encode
+        
+        Returns:
+            The region after an encode/decode round trip, or None on error.
+        """
+        format_name = self.format_var.get()
+        settings = self.get_encoder_settings()
+        output_image = self.get_output_image()
+        key = (settings_key(format_name, settings), box, self._output_image_cache[0])
+        if self._comparison_cache is None or self._comparison_cache[0] != key:
+            try:
+                region = encode_region(output_image, box, format_name, settings, self.palette_cache)
+            except Exception:
+                return None
+            self._comparison_cache = (key, region)
+        return self._comparison_cache[1]
     
     def on_drop(self, event: tk.Event) -> None:
         """Handle file drop events.
@@ -298,6 +539,9 @@ class ImageFormatConverter(UISetupMixin):
                 self.load_image(files[0])
             except ImageLoadError as e:
                 messagebox.showerror("Error", str(e))
+        if len(files) > 1:
+            self.open_queue_window()
+            self.add_to_queue(files)
     
     def browse_file(self, event: tk.Event) -> None:
         """Handle file browse events.
@@ -326,14 +570,91 @@ class ImageFormatConverter(UISetupMixin):
         """
         format_name = self.format_var.get()
         
-        if format_name in ["JPEG", "WEBP"]:
+        if supports_option(format_name, "quality"):
             self.quality_frame.grid()
         else:
             self.quality_frame.grid_remove()
         
+        self.build_encoder_option_widgets(format_name)
+        
+        # Formats without EXIF force orientation, which can change the output image
+        if self.source_image and self.show_output_image():
+            if self.auto_quality_var.get() and supports_option(format_name, "quality"):
+                self.apply_auto_quality()
+            self.update_file_size_preview()
+    
+    def get_encoder_settings(self) -> Dict[str, Any]:
+        """Collect the encoder settings for the selected format from the UI.
+        
+        Returns:
+            Normalized settings for every option of the selected format.
+        """
+        format_name = self.format_var.get()
+        settings = dict(self.encoder_settings[format_name])
+        
+        for option in get_encoder_options(format_name):
+            if option.name == "quality":
+                settings["quality"] = self.quality_var.get()
+                continue
+            variable = self.encoder_vars.get(option.name)
+            if variable is None:
+                continue
+            try:
+                value = variable.get()
+            except tk.TclError:
+                continue  # Invalid input, keep the stored value
+            if option.kind == CHOICE_OPTION:
+                value = dict(option.choices).get(value, option.default)
+            settings[option.name] = value
+        
+        settings = normalize_settings(format_name, settings)
+        self.encoder_settings[format_name] = settings
+        return settings
+    
+    def on_encoder_option_change(self, *args: Any) -> None:
+        """Handle changes to any encoder option widget.
+        
+        Args:
+            args: Event or callback arguments (ignored)
+        """
+        self.get_encoder_settings()
         if self.source_image:
+            if self.auto_quality_var.get() and supports_option(self.format_var.get(), "quality"):
+                self.apply_auto_quality()
             self.update_file_size_preview()
     
+    def on_auto_quality_toggle(self) -> None:
+        """Handle the auto quality checkbox.
+        
+        Locks the manual quality controls while auto quality is active.
+        """
+        if self.auto_quality_var.get():
+            self.quality_slider.state(['disabled'])
+            self.quality_entry.configure(state='disabled')
+        else:
+            self.quality_slider.state(['!disabled'])
+            self.quality_entry.configure(state='normal')
+            self.auto_quality_result_var.set("")
+        self.on_format_change()
+    
+    def apply_auto_quality(self) -> None:
+        """Pick the lowest quality meeting the SSIM target and show the result."""
+        try:
+            result = find_auto_quality(
+                self.get_output_image(),
+                self.format_var.get(),
+                DEFAULT_AUTO_QUALITY_TARGET,
+                settings=self.get_encoder_settings()
+            )
+        except Exception as e:
+            self.auto_quality_result_var.set(f"Auto quality unavailable: {e}")
+            return
+        
+        self.quality_var.set(result.quality)
+        self.auto_quality_result_var.set(
+            f"Chosen quality {result.quality}% (SSIM {result.score:.3f})"
+        )
+    
     def on_quality_change(self, value: str) -> None:
         """Handle quality slider changes.
         
@@ -349,6 +670,8 @@ class ImageFormatConverter(UISetupMixin):
         
         Validates the quality value and updates the preview if valid.
         """
+        if self.auto_quality_var.get():
+            return
         try:
             value = int(self.quality_entry.get())
             if MIN_QUALITY <= value <= MAX_QUALITY:
@@ -358,6 +681,307 @@ class ImageFormatConverter(UISetupMixin):
         except ValueError:
             pass  # Invalid input, ignore
     
+    def get_resize_options(self) -> Optional[ResizeOptions]:
+        """Build resize options from the resize controls.
+        
+        Returns:
+            The resize options, or None if resizing is off or the value is invalid.
+        """
+        mode = self.resize_mode_var.get()
+        try:
+            value = int(self.resize_value_var.get())
+        except ValueError:
+            return None
+        if value <= 0:
+            return None
+        
+        if mode == RESIZE_MODES[1]:
+            return ResizeOptions(max_dimension=value)
+        if mode == RESIZE_MODES[2]:
+            return ResizeOptions(scale=value / 100)
+        return None
+    
+    def get_metadata_options(self) -> MetadataOptions:
+        """Build metadata options from the metadata checkboxes.
+        
+        Returns:
+            The metadata options, adjusted to the selected format.
+        """
+        return MetadataOptions(
+            apply_orientation=self.apply_orientation_var.get(),
+            keep_exif=self.keep_exif_var.get(),
+            keep_icc=self.keep_icc_var.get(),
+            keep_xmp=self.keep_xmp_var.get(),
+            convert_to_srgb=self.convert_srgb_var.get()
+        ).for_format(self.format_var.get())
+    
+    def get_output_image(self) -> Image.Image:
+        """Get the source image with the current resize and metadata options applied.
+        
+        The processed image is cached so slider and format changes do not
+        repeat the resize, rotation or color conversion.
+        
+        Returns:
+            The image that will be encoded.
+        """
+        key = (self.get_resize_options(), self.get_metadata_options())
+        if self._output_image_cache is None or self._output_image_cache[0] != key:
+            self._output_image_cache = (key, render_image(self.source_image, *key))
+        return self._output_image_cache[1]
+    
+    def on_metadata_change(self) -> None:
+        """Handle metadata checkbox changes.
+        
+        Reloads the preview so a changed orientation setting is shown.
+        """
+        if not self.source_image:
+            return
+        try:
+            self.load_image(self.source_path, reloading=True)
+        except ImageLoadError as e:
+            messagebox.showerror("Error", str(e))
+    
+    def on_resize_mode_change(self, event: Optional[tk.Event] = None) -> None:
+        """Handle resize mode selection changes.
+        
+        Args:
+            event: The combobox selection event (optional)
+        """
+        mode = self.resize_mode_var.get()
+        if mode == RESIZE_MODES[1]:
+            self.resize_value_var.set(str(DEFAULT_MAX_DIMENSION))
+        elif mode == RESIZE_MODES[2]:
+            self.resize_value_var.set(str(DEFAULT_RESIZE_SCALE))
+        self.resize_entry.configure(
+            state='disabled' if mode == RESIZE_MODES[0] else 'normal'
+        )
+        self.on_resize_change()
+    
+    def on_resize_change(self, event: Optional[tk.Event] = None) -> None:
+        """Handle resize value changes.
+        
+        Args:
+            event: The entry key release event (optional)
+        """
+        if not self.source_image:
+            self.output_size_var.set("")
+            return
+        self.on_format_change()
+    
+    def show_output_image(self) -> bool:
+        """Show the output image and its size in the preview.
+        
+        Returns:
+            Whether the output image could be built.
+        """
+        try:
+            output_image = self.get_output_image()
+        except Exception as e:
+            self.output_size_var.set("Output: resize failed")
+            messagebox.showerror("Error", f"Could not resize the image: {e}")
+            return False
+        self.output_size_var.set(f"Output: {output_image.width} × {output_image.height} px")
+        self.preview.set_image(output_image)
+        return True
+    
+    def open_queue_window(self) -> None:
+        """Show the batch queue window, creating it on first use."""
+        if self.queue_window is not None and self.queue_window.winfo_exists():
+            self.queue_window.deiconify()
+            self.queue_window.lift()
+        else:
+            self.queue_window = self.setup_queue_window()
+        self.refresh_queue_view()
+    
+    def add_to_queue(self, file_paths: Tuple[str, ...]) -> None:
+        """Add files to the batch queue.
+        
+        Args:
+            file_paths: Paths of the files to add
+        """
+        self.queue.extend(file_paths)
+        self.refresh_queue_view()
+    
+    def on_queue_drop(self, event: tk.Event) -> None:
+        """Handle files dropped on the queue window.
+        
+        Args:
+            event: The drop event containing file paths
+        """
+        self.add_to_queue(self.root.tk.splitlist(event.data))
+    
+    def browse_queue_files(self) -> None:
+        """Add files chosen in a file dialog to the queue."""
+        file_paths = filedialog.askopenfilenames(
+            title="Add Images to Queue",
+            parent=self.queue_window,
+            filetypes=[
+                ("Image files", "*.jpg *.jpeg *.png *.bmp *.tiff *.tif *.webp *.gif"),
+                ("All files", "*.*")
+            ]
+        )
+        if file_paths:
+            self.add_to_queue(file_paths)
+    
+    def browse_queue_folder(self) -> None:
+        """Scan a folder in the background and add its images to the queue."""
+        folder = filedialog.askdirectory(title="Add Folder to Queue", parent=self.queue_window)
+        if folder:
+            self.start_queue_worker(self._scan_into_queue, folder)
+    
+    def _scan_into_queue(self, folder: str) -> None:
+        """Scan a folder and add the images found to the queue.
+        
+        Runs on the queue worker thread. The probe index makes repeat scans
+        of the same folder cheap; scanning still works without it.
+        
+        Args:
+            folder: Folder to scan, including subfolders
+        """
+        try:
+            index = ProbeIndex()
+        except Exception:
+            index = None
+        try:
+            self.queue.extend_probed(scan_directory(folder, index=index))
+        finally:
+            if index is not None:
+                index.close()
+    
+    def clear_queue(self) -> None:
+        """Remove all entries from the queue."""
+        if self.queue_busy():
+            messagebox.showinfo("Queue", "Wait for the queue to finish first", parent=self.queue_window)
+            return
+        self.queue.clear()
+        self.refresh_queue_view()
+    
+    def retry_failed_queue(self) -> None:
+        """Mark failed entries as pending again."""
+        if not self.queue_busy():
+            self.queue.reset_failed()
+            self.refresh_queue_view()
+    
+    def toggle_queue(self) -> None:
+        """Start converting the queue, or stop a running conversion."""
+        if self.queue.running:
+            self.queue.stop()
+            self.queue_run_button.configure(text="Stopping...", state="disabled")
+            return
+        if self.queue_busy():
+            return
+        if not self.queue.counts()[PENDING]:
+            messagebox.showinfo("Queue", "There are no pending files to convert", parent=self.queue_window)
+            return
+        
+        output_dir = filedialog.askdirectory(
+            title="Select Output Folder",
+            parent=self.queue_window,
+            initialdir=os.path.dirname(self.queue.path(0))
+        )
+        if not output_dir:
+            return
+        
+        # Capture the settings on the UI thread; the worker never touches Tk
+        format_name = self.format_var.get()
+        self.start_queue_worker(
+            self.queue.run,
+            output_dir,
+            format_name,
+            self.get_encoder_settings(),
+            self.auto_quality_var.get(),
+            resize=self.get_resize_options(),
+            metadata=self.get_metadata_options()
+        )
+        self.queue_run_button.configure(text="■ Stop")
+    
+    def queue_busy(self) -> bool:
+        """Check whether the queue worker thread is running."""
+        return self._queue_worker is not None and self._queue_worker.is_alive()
+    
+    def start_queue_worker(self, target: Any, *args: Any, **kwargs: Any) -> None:
+        """Run a queue task on a background thread and poll it for progress.
+        
+        Args:
+            target: Function to run
+            args: Positional arguments for ``target``
+            kwargs: Keyword arguments for ``target``
+        """
+        if self.queue_busy():
+            messagebox.showinfo("Queue", "The queue is busy", parent=self.queue_window)
+            return
+        
+        def run() -> None:
+            try:
+                target(*args, **kwargs)
+            except Exception as e:
+                self._queue_error = str(e)
+        
+        self._queue_error = None
+        self._queue_worker = threading.Thread(target=run, daemon=True)
+        self._queue_worker.start()
+        self.root.after(QUEUE_REFRESH_MS, self.poll_queue)
+    
+    def poll_queue(self) -> None:
+        """Refresh the queue window until the worker thread finishes."""
+        self.refresh_queue_view()
+        if self.queue_busy():
+            self.root.after(QUEUE_REFRESH_MS, self.poll_queue)
+            return
+        
+        if self.queue_window is not None and self.queue_window.winfo_exists():
+            self.queue_run_button.configure(text="▶ Convert Queue", state="normal")
+        if self._queue_error:
+            messagebox.showerror("Queue Error", self._queue_error, parent=self.queue_window)
+            self._queue_error = None
+    
+    def refresh_queue_view(self) -> None:
+        """Update the queue summary and the visible queue rows."""
+        counts = self.queue.counts()
+        total = len(self.queue)
+        if total:
+            summary = f"{total:,} files · {counts[DONE]:,} done"
+            if counts[FAILED]:
+                summary += f" · {counts[FAILED]:,} failed"
+            if self.queue.bytes_saved:
+                summary += f" · {self._format_file_size(self.queue.bytes_saved)} saved"
+            self.queue_status_var.set(summary)
+        else:
+            self.queue_status_var.set("Queue is empty")
+        
+        if self.queue_window is not None and self.queue_window.winfo_exists():
+            self.queue_view.refresh()
+    
+    def format_queue_row(self, index: int) -> str:
+        """Format one queue entry for the queue view.
+        
+        Args:
+            index: Position in the queue
+            
+        Returns:
+            The row text (e.g., "Done        photo.jpg  4000 × 3000  1.2 MB → 412.0 KB  q72  SSIM 0.951")
+        """
+        entry = self.queue[index]
+        parts = [f"{STATUS_LABELS[entry.status]:<11}", os.path.basename(entry.path)]
+        if entry.width:
+            parts.append(f"{entry.width} × {entry.height}")
+        if entry.status == FAILED:
+            parts.append(entry.error or "")
+        elif entry.output_bytes != UNKNOWN:
+            source = (
+                self._format_file_size(entry.source_bytes) + " → "
+                if entry.source_bytes != UNKNOWN
+                else ""
+            )
+            parts.append(f"{source}{self._format_file_size(entry.output_bytes)}")
+            if entry.quality != UNKNOWN:
+                parts.append(f"q{entry.quality}")
+            if entry.score != UNKNOWN:
+                parts.append(f"SSIM {entry.score:.3f}")
+        elif entry.source_bytes != UNKNOWN:
+            parts.append(self._format_file_size(entry.source_bytes))
+        return "  ".join(parts)
+    
     def show_quality_controls(self) -> None:
         """Show the quality control panel for formats that support quality settings."""
         self.quality_frame.grid()
@@ -366,6 +990,26 @@ class ImageFormatConverter(UISetupMixin):
         """Hide the quality control panel for formats that don't support quality settings."""
         self.quality_frame.grid_remove()
     
+    def _format_image_info(self, info: ImageInfo) -> str:
+        """Format header details of an image for display.
+        
+        Args:
+            info: Header details of the image
+            
+        Returns:
+            Formatted details (e.g., "4000 × 3000 px · JPEG · RGB · EXIF, ICC")
+        """
+        width, height = info.display_size
+        parts = [f"{width} × {height} px", info.format or "Unknown", info.mode]
+        metadata = [
+            name
+            for name, present in (("EXIF", info.has_exif), ("ICC", info.has_icc), ("XMP", info.has_xmp))
+            if present
+        ]
+        if metadata:
+            parts.append(", ".join(metadata))
+        return " · ".join(parts)
+    
     def _format_file_size(self, size_bytes: int) -> str:
         """Format file size in bytes to human-readable string.
         
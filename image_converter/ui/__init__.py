@@ -1,4 +1,6 @@
 """UI components for the Image Format Converter."""
 from .mixins import UISetupMixin
+from .preview_view import ImagePreview
+from .queue_view import VirtualListView
 
-__all__ = ['UISetupMixin']
+__all__ = ['UISetupMixin', 'ImagePreview', 'VirtualListView']
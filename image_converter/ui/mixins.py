@@ -4,7 +4,10 @@ from tkinter import ttk
 from tkinterdnd2 import DND_FILES
 from typing import Any
 
-from ..constants import COLORS, DROP_AREA_MIN_HEIGHT
+from ..constants import COLORS, DROP_AREA_MIN_HEIGHT, RESIZE_MODES
+from ..core.encoders import BOOL_OPTION, CHOICE_OPTION, INT_OPTION, get_encoder_options
+from .preview_view import ImagePreview
+from .queue_view import VirtualListView
 
 class UISetupMixin:
     """Mixin class containing UI setup methods.
@@ -15,8 +18,22 @@ class UISetupMixin:
         - colors: Color scheme dictionary
         - formats: Supported formats dictionary
         - quality_var: Quality IntVar
+        - auto_quality_var: Auto quality BooleanVar
+        - auto_quality_result_var: Auto quality result StringVar
         - format_var: Format StringVar
+        - encoder_settings: Encoder settings per format
+        - encoder_vars: Variables of the encoder option widgets being shown
+        - encoder_options_format: Format the encoder option widgets belong to
         - file_size_var: File size StringVar
+        - resize_mode_var: Resize mode StringVar
+        - resize_value_var: Resize value StringVar
+        - output_size_var: Output dimensions StringVar
+        - image_info_var: Source image details StringVar
+        - apply_orientation_var, keep_exif_var, keep_icc_var, keep_xmp_var,
+          convert_srgb_var: Metadata option BooleanVars
+        - queue: The batch ConversionQueue
+        - queue_status_var: Queue summary StringVar
+        - preview_comparison: Returns an encoded region for the preview
     """
     
     def setup_ui(self: Any) -> None:
@@ -33,8 +50,10 @@ class UISetupMixin:
         main_frame.grid_rowconfigure(1, weight=1)  # Drop area gets most space
         main_frame.grid_rowconfigure(2, weight=0)  # Format selection
         main_frame.grid_rowconfigure(3, weight=0)  # Quality settings
-        main_frame.grid_rowconfigure(4, weight=0)  # File size preview
-        main_frame.grid_rowconfigure(5, weight=0)  # Convert button
+        main_frame.grid_rowconfigure(4, weight=0)  # Resize settings
+        main_frame.grid_rowconfigure(5, weight=0)  # Metadata settings
+        main_frame.grid_rowconfigure(6, weight=0)  # File size preview
+        main_frame.grid_rowconfigure(7, weight=0)  # Convert button
         main_frame.grid_columnconfigure(0, weight=1)
         
         # Header
@@ -50,8 +69,14 @@ class UISetupMixin:
         quality_frame = self.setup_quality_control(main_frame)
         quality_frame.grid(row=3, column=0, sticky='ew', padx=5, pady=5)
         
+        resize_frame = self.setup_resize_control(main_frame)
+        resize_frame.grid(row=4, column=0, sticky='ew', padx=5, pady=5)
+        
+        metadata_frame = self.setup_metadata_control(main_frame)
+        metadata_frame.grid(row=5, column=0, sticky='ew', padx=5, pady=5)
+        
         size_frame = self.setup_file_size_preview(main_frame)
-        size_frame.grid(row=4, column=0, sticky='ew', padx=5, pady=5)
+        size_frame.grid(row=6, column=0, sticky='ew', padx=5, pady=5)
         
         self.setup_convert_button(main_frame)
     
@@ -103,6 +128,16 @@ class UISetupMixin:
         )
         title_label.grid(row=0, column=0, sticky='w')
         
+        # Source details read from the file header
+        info_label = tk.Label(
+            title_frame,
+            textvariable=self.image_info_var,
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        info_label.grid(row=0, column=1, sticky='e')
+        
         # Content frame
         content_frame = tk.Frame(drop_frame, bg=self.colors['card'])
         content_frame.grid(row=1, column=0, sticky='nsew', padx=8, pady=(0, 8))
@@ -119,8 +154,6 @@ class UISetupMixin:
         def maintain_ratio(event):
             width = event.width
             self.drop_container.configure(height=DROP_AREA_MIN_HEIGHT)
-            if hasattr(self, 'source_image') and self.source_image:
-                self.load_image(None, reloading=True)
         
         self.drop_container.bind('<Configure>', maintain_ratio)
         
@@ -142,6 +175,18 @@ class UISetupMixin:
         self.drop_area.dnd_bind('<<Drop>>', self.on_drop)
         self.drop_area.bind('<Button-1>', self.browse_file)
         
+        # Pan/zoom preview, shown in place of the drop label once an image is loaded
+        self.preview = ImagePreview(
+            self.drop_container,
+            self.colors,
+            self.preview_comparison,
+            lambda: self.browse_file(None)
+        )
+        self.preview.grid(row=0, column=0, sticky='nsew')
+        self.preview.grid_remove()
+        self.preview.canvas.drop_target_register(DND_FILES)
+        self.preview.canvas.dnd_bind('<<Drop>>', self.on_drop)
+        
         return drop_frame
     
     def setup_format_selection(self: Any, parent: tk.Widget) -> tk.Frame:
@@ -189,8 +234,104 @@ class UISetupMixin:
         format_combo.grid(row=0, column=1, sticky='ew')
         format_combo.bind('<<ComboboxSelected>>', self.on_format_change)
         
+        # Encoder options of the selected format, filled by build_encoder_option_widgets
+        self.encoder_options_frame = tk.Frame(format_frame, bg=self.colors['card'])
+        self.encoder_options_frame.grid(row=2, column=0, sticky='ew', padx=8, pady=(0, 8))
+        self.encoder_options_frame.grid_columnconfigure(1, weight=1)
+        self.build_encoder_option_widgets(self.format_var.get())
+        
         return format_frame
     
+    def build_encoder_option_widgets(self: Any, format_name: str) -> None:
+        """Create widgets for the encoder options of a format.
+        
+        Quality is left out because it has its own card. Nothing is rebuilt
+        if the widgets already belong to ``format_name``.
+        
+        Args:
+            format_name: The selected format
+        """
+        if getattr(self, 'encoder_options_format', None) == format_name:
+            return
+        self.encoder_options_format = format_name
+        
+        for child in self.encoder_options_frame.winfo_children():
+            child.destroy()
+        self.encoder_vars = {}
+        
+        settings = self.encoder_settings[format_name]
+        options = [
+            option
+            for option in get_encoder_options(format_name)
+            if option.name != "quality"
+        ]
+        if not options:
+            self.encoder_options_frame.grid_remove()
+            return
+        self.encoder_options_frame.grid()
+        
+        for row, option in enumerate(options):
+            value = settings[option.name]
+            
+            if option.kind == BOOL_OPTION:
+                variable = tk.BooleanVar(value=value)
+                widget = tk.Checkbutton(
+                    self.encoder_options_frame,
+                    text=option.label,
+                    variable=variable,
+                    command=self.on_encoder_option_change,
+                    font=("Segoe UI", 10),
+                    fg=self.colors['text'],
+                    bg=self.colors['card'],
+                    activeforeground=self.colors['text'],
+                    activebackground=self.colors['card'],
+                    selectcolor=self.colors['input_bg']
+                )
+                widget.grid(row=row, column=0, columnspan=2, sticky='w')
+                self.encoder_vars[option.name] = variable
+                continue
+            
+            label = tk.Label(
+                self.encoder_options_frame,
+                text=f"{option.label}:",
+                font=("Segoe UI", 10),
+                fg=self.colors['text'],
+                bg=self.colors['card']
+            )
+            label.grid(row=row, column=0, sticky='w', padx=(0, 10), pady=(2, 0))
+            
+            if option.kind == INT_OPTION:
+                variable = tk.IntVar(value=value)
+                widget = ttk.Spinbox(
+                    self.encoder_options_frame,
+                    from_=option.minimum,
+                    to=option.maximum,
+                    textvariable=variable,
+                    width=5,
+                    command=self.on_encoder_option_change
+                )
+                widget.bind('<KeyRelease>', self.on_encoder_option_change)
+                widget.grid(row=row, column=1, sticky='w', pady=(2, 0))
+            elif option.kind == CHOICE_OPTION:
+                labels = [choice_label for choice_label, _ in option.choices]
+                current = next(
+                    (choice_label for choice_label, choice in option.choices if choice == value),
+                    labels[0]
+                )
+                variable = tk.StringVar(value=current)
+                widget = ttk.Combobox(
+                    self.encoder_options_frame,
+                    textvariable=variable,
+                    values=labels,
+                    state="readonly",
+                    font=("Segoe UI", 10)
+                )
+                widget.bind('<<ComboboxSelected>>', self.on_encoder_option_change)
+                widget.grid(row=row, column=1, sticky='ew', pady=(2, 0))
+            else:
+                continue
+            self.encoder_vars[option.name] = variable
+    
     def setup_quality_control(self: Any, parent: tk.Widget) -> tk.Frame:
         """Set up the quality control area."""
         # Quality control frame with modern card styling
@@ -262,12 +403,150 @@ class UISetupMixin:
         )
         quality_percent_label.grid(row=0, column=3, padx=(3, 0))
         
+        # Auto quality toggle
+        auto_quality_check = tk.Checkbutton(
+            content_frame,
+            text="Auto (lowest quality meeting the SSIM target)",
+            variable=self.auto_quality_var,
+            command=self.on_auto_quality_toggle,
+            font=("Segoe UI", 10),
+            fg=self.colors['text'],
+            bg=self.colors['card'],
+            activeforeground=self.colors['text'],
+            activebackground=self.colors['card'],
+            selectcolor=self.colors['input_bg']
+        )
+        auto_quality_check.grid(row=1, column=0, columnspan=4, sticky='w', pady=(4, 0))
+        
+        # Auto quality result label
+        auto_quality_label = tk.Label(
+            content_frame,
+            textvariable=self.auto_quality_result_var,
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        auto_quality_label.grid(row=2, column=0, columnspan=4, sticky='w')
+        
         # Initially hide quality controls
         self.quality_frame.grid(row=3, column=0, sticky='ew', padx=5, pady=5)
         self.hide_quality_controls()
         
         return self.quality_frame
     
+    def setup_resize_control(self: Any, parent: tk.Widget) -> tk.Frame:
+        """Set up the resize settings area."""
+        # Resize frame with modern card styling
+        resize_frame = tk.Frame(parent, bg=self.colors['card'], relief='flat', bd=0)
+        resize_frame.grid_columnconfigure(0, weight=1)
+        
+        # Card title
+        title_frame = tk.Frame(resize_frame, bg=self.colors['card'])
+        title_frame.grid(row=0, column=0, sticky='ew', padx=8, pady=(8, 4))
+        
+        title_frame.grid_columnconfigure(0, weight=1)
+        title_label = tk.Label(
+            title_frame,
+            text="📐 Resize",
+            font=("Segoe UI", 12, "bold"),
+            fg=self.colors['text'],
+            bg=self.colors['card']
+        )
+        title_label.grid(row=0, column=0, sticky='w')
+        
+        # Content frame
+        content_frame = tk.Frame(resize_frame, bg=self.colors['card'])
+        content_frame.grid(row=1, column=0, sticky='ew', padx=8, pady=(0, 8))
+        content_frame.grid_columnconfigure(0, weight=1)
+        
+        # Resize mode combobox
+        resize_combo = ttk.Combobox(
+            content_frame,
+            textvariable=self.resize_mode_var,
+            values=RESIZE_MODES,
+            state="readonly",
+            font=("Segoe UI", 10)
+        )
+        resize_combo.grid(row=0, column=0, sticky='ew', padx=(0, 10))
+        resize_combo.bind('<<ComboboxSelected>>', self.on_resize_mode_change)
+        
+        # Resize value input field
+        self.resize_entry = tk.Entry(
+            content_frame,
+            textvariable=self.resize_value_var,
+            width=6,
+            font=("Segoe UI", 10),
+            relief='flat',
+            bd=1,
+            bg=self.colors['input_bg'],
+            fg=self.colors['text'],
+            insertbackground=self.colors['text'],
+            state='disabled'
+        )
+        self.resize_entry.grid(row=0, column=1)
+        self.resize_entry.bind('<KeyRelease>', self.on_resize_change)
+        
+        # Output dimensions label
+        output_size_label = tk.Label(
+            content_frame,
+            textvariable=self.output_size_var,
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        output_size_label.grid(row=1, column=0, columnspan=2, sticky='w', pady=(4, 0))
+        
+        return resize_frame
+    
+    def setup_metadata_control(self: Any, parent: tk.Widget) -> tk.Frame:
+        """Set up the metadata settings area."""
+        # Metadata frame with modern card styling
+        metadata_frame = tk.Frame(parent, bg=self.colors['card'], relief='flat', bd=0)
+        metadata_frame.grid_columnconfigure(0, weight=1)
+        
+        # Card title
+        title_frame = tk.Frame(metadata_frame, bg=self.colors['card'])
+        title_frame.grid(row=0, column=0, sticky='ew', padx=8, pady=(8, 4))
+        
+        title_frame.grid_columnconfigure(0, weight=1)
+        title_label = tk.Label(
+            title_frame,
+            text="🏷️ Metadata",
+            font=("Segoe UI", 12, "bold"),
+            fg=self.colors['text'],
+            bg=self.colors['card']
+        )
+        title_label.grid(row=0, column=0, sticky='w')
+        
+        # Content frame
+        content_frame = tk.Frame(metadata_frame, bg=self.colors['card'])
+        content_frame.grid(row=1, column=0, sticky='ew', padx=8, pady=(0, 8))
+        
+        # Metadata checkboxes, three per row
+        options = [
+            ("Apply orientation", self.apply_orientation_var),
+            ("Convert to sRGB", self.convert_srgb_var),
+            ("Keep EXIF", self.keep_exif_var),
+            ("Keep ICC", self.keep_icc_var),
+            ("Keep XMP", self.keep_xmp_var)
+        ]
+        for index, (text, variable) in enumerate(options):
+            check = tk.Checkbutton(
+                content_frame,
+                text=text,
+                variable=variable,
+                command=self.on_metadata_change,
+                font=("Segoe UI", 10),
+                fg=self.colors['text'],
+                bg=self.colors['card'],
+                activeforeground=self.colors['text'],
+                activebackground=self.colors['card'],
+                selectcolor=self.colors['input_bg']
+            )
+            check.grid(row=index // 3, column=index % 3, sticky='w', padx=(0, 10))
+        
+        return metadata_frame
+    
     def setup_file_size_preview(self: Any, parent: tk.Widget) -> tk.Frame:
         """Set up the file size preview area."""
         # File size preview frame with modern card styling
@@ -314,9 +593,13 @@ class UISetupMixin:
         return size_frame
     
     def setup_convert_button(self: Any, parent: tk.Widget) -> None:
-        """Set up the convert and save button."""
+        """Set up the convert and save button and the batch queue button."""
+        button_frame = tk.Frame(parent, bg=self.colors['bg'])
+        button_frame.grid(row=7, column=0, sticky='ew', padx=5, pady=5)
+        button_frame.grid_columnconfigure(0, weight=1)
+        
         self.convert_button = tk.Button(
-            parent,
+            button_frame,
             text="💾 Convert & Save",
             command=self.convert_and_save,
             state="disabled",
@@ -332,7 +615,24 @@ class UISetupMixin:
             pady=10,
             cursor="hand2"
         )
-        self.convert_button.grid(row=5, column=0, sticky='ew', padx=5, pady=5)
+        self.convert_button.grid(row=0, column=0, sticky='ew')
+        
+        queue_button = tk.Button(
+            button_frame,
+            text="📋 Queue",
+            command=self.open_queue_window,
+            font=("Segoe UI", 12, "bold"),
+            bg=self.colors['primary'],
+            fg='black',
+            activebackground=self.colors['hover_primary'],
+            activeforeground='black',
+            relief='flat',
+            bd=0,
+            padx=12,
+            pady=10,
+            cursor="hand2"
+        )
+        queue_button.grid(row=0, column=1, sticky='ns', padx=(8, 0))
         
         # Set up hover effects
         self.convert_button.bind(
@@ -348,4 +648,113 @@ class UISetupMixin:
                 bg=self.colors['success'],
                 fg='black'
             )
-        )
\ No newline at end of file
+        )
+    
+    def setup_queue_window(self: Any) -> tk.Toplevel:
+        """Set up the batch queue window."""
+        window = tk.Toplevel(self.root)
+        window.title("📋 Batch Queue")
+        window.configure(bg=self.colors['bg'])
+        window.geometry("560x460")
+        window.minsize(420, 300)
+        window.grid_rowconfigure(0, weight=1)
+        window.grid_columnconfigure(0, weight=1)
+        
+        # Queue frame with modern card styling
+        queue_frame = tk.Frame(window, bg=self.colors['card'], relief='flat', bd=0)
+        queue_frame.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
+        queue_frame.grid_columnconfigure(0, weight=1)
+        queue_frame.grid_rowconfigure(1, weight=1)
+        
+        # Card title
+        title_frame = tk.Frame(queue_frame, bg=self.colors['card'])
+        title_frame.grid(row=0, column=0, sticky='ew', padx=8, pady=(8, 4))
+        
+        title_frame.grid_columnconfigure(0, weight=1)
+        title_label = tk.Label(
+            title_frame,
+            text="📋 Batch Queue",
+            font=("Segoe UI", 12, "bold"),
+            fg=self.colors['text'],
+            bg=self.colors['card']
+        )
+        title_label.grid(row=0, column=0, sticky='w')
+        
+        status_label = tk.Label(
+            title_frame,
+            textvariable=self.queue_status_var,
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        status_label.grid(row=0, column=1, sticky='e')
+        
+        # Queue entries; only the visible rows exist as Listbox items
+        self.queue_view = VirtualListView(
+            queue_frame,
+            lambda: len(self.queue),
+            self.format_queue_row,
+            self.colors
+        )
+        self.queue_view.grid(row=1, column=0, sticky='nsew', padx=8)
+        
+        hint_label = tk.Label(
+            queue_frame,
+            text="Files are converted with the format and options of the main window",
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        hint_label.grid(row=2, column=0, sticky='w', padx=8, pady=(4, 0))
+        
+        # Queue actions
+        button_frame = tk.Frame(queue_frame, bg=self.colors['card'])
+        button_frame.grid(row=3, column=0, sticky='ew', padx=8, pady=8)
+        button_frame.grid_columnconfigure(4, weight=1)
+        
+        actions = (
+            ("Add Files", self.browse_queue_files),
+            ("Add Folder", self.browse_queue_folder),
+            ("Retry Failed", self.retry_failed_queue),
+            ("Clear", self.clear_queue)
+        )
+        for column, (text, command) in enumerate(actions):
+            button = tk.Button(
+                button_frame,
+                text=text,
+                command=command,
+                font=("Segoe UI", 10),
+                bg=self.colors['input_bg'],
+                fg=self.colors['text'],
+                activebackground=self.colors['border'],
+                activeforeground=self.colors['text'],
+                relief='flat',
+                bd=0,
+                padx=10,
+                pady=4,
+                cursor="hand2"
+            )
+            button.grid(row=0, column=column, padx=(0, 6))
+        
+        self.queue_run_button = tk.Button(
+            button_frame,
+            text="▶ Convert Queue",
+            command=self.toggle_queue,
+            font=("Segoe UI", 10, "bold"),
+            bg=self.colors['success'],
+            fg='black',
+            activebackground=self.colors['hover_success'],
+            activeforeground='black',
+            relief='flat',
+            bd=0,
+            padx=12,
+            pady=4,
+            cursor="hand2"
+        )
+        self.queue_run_button.grid(row=0, column=4, sticky='e')
+        
+        # Dropping files on the queue window adds them all
+        self.queue_view.listbox.drop_target_register(DND_FILES)
+        self.queue_view.listbox.dnd_bind('<<Drop>>', self.on_queue_drop)
+        
+        return window
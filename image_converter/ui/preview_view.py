@@ -0,0 +1,362 @@
+"""Zoomable, pannable image preview backed by a tile pyramid."""
+import math
+import tkinter as tk
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image, ImageTk
+
+from ..constants import (
+    PREVIEW_COMPARE_DELAY_MS,
+    PREVIEW_COMPARE_MAX_PIXELS,
+    PREVIEW_MAX_ZOOM,
+    PREVIEW_REFINE_DELAY_MS,
+    PREVIEW_ZOOM_STEP
+)
+from ..core.preview import Box, TilePyramid, visible_region
+
+
+class ImagePreview(tk.Frame):
+    """Preview that only renders the part of the image on screen.
+    
+    Each redraw renders the visible region from a ``TilePyramid``, so a
+    100 MP image costs no more to show than a small one. When the tiles for
+    the current zoom are not built yet, a low-res pass from the pyramid's
+    overview is shown first and replaced by the full-quality pass right
+    after. In compare mode the right half of the view shows the visible
+    region encoded with the current settings; while the view is panned or
+    zoomed only the original is drawn, and the region is encoded once the
+    view rests.
+    """
+    
+    def __init__(
+        self,
+        parent: tk.Widget,
+        colors: Dict[str, str],
+        compare_provider: Callable[[Tuple[int, int, int, int]], Optional[Image.Image]],
+        on_open: Callable[[], None]
+    ) -> None:
+        """Create the preview.
+        
+        Args:
+            parent: Parent widget
+            colors: Color scheme dictionary
+            compare_provider: Returns a region encoded and decoded with the
+                current settings, or None if that is not possible
+            on_open: Called when the user asks to open another file
+        """
+        super().__init__(parent, bg=colors['input_bg'])
+        self.colors = colors
+        self.compare_provider = compare_provider
+        self.pyramid: Optional[TilePyramid] = None
+        self.zoom = 1.0
+        self.center = (0.0, 0.0)
+        self.fit_mode = True
+        self.compare_var = tk.BooleanVar(value=False)
+        self.zoom_var = tk.StringVar(value="")
+        self._photo: Optional[ImageTk.PhotoImage] = None
+        self._refine_job: Optional[str] = None
+        self._drag_origin: Optional[Tuple[int, int]] = None
+        
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.canvas = tk.Canvas(
+            self,
+            bg=colors['input_bg'],
+            highlightthickness=0,
+            bd=0,
+            cursor="fleur"
+        )
+        self.canvas.grid(row=0, column=0, sticky='nsew')
+        
+        # Toolbar
+        toolbar = tk.Frame(self, bg=colors['card'])
+        toolbar.grid(row=1, column=0, sticky='ew', pady=(4, 0))
+        toolbar.grid_columnconfigure(0, weight=1)
+        
+        zoom_label = tk.Label(
+            toolbar,
+            textvariable=self.zoom_var,
+            font=("Segoe UI", 9),
+            fg=self.colors['text_light'],
+            bg=self.colors['card']
+        )
+        zoom_label.grid(row=0, column=0, sticky='w')
+        
+        for column, (text, command) in enumerate(
+            (("Fit", self.fit), ("1:1", self.actual_size), ("Open…", on_open)),
+            start=1
+        ):
+            button = tk.Button(
+                toolbar,
+                text=text,
+                command=command,
+                font=("Segoe UI", 9),
+                bg=self.colors['input_bg'],
+                fg=self.colors['text'],
+                activebackground=self.colors['border'],
+                activeforeground=self.colors['text'],
+                relief='flat',
+                bd=0,
+                padx=8,
+                cursor="hand2"
+            )
+            button.grid(row=0, column=column, padx=(4, 0))
+        
+        compare_check = tk.Checkbutton(
+            toolbar,
+            text="Compare",
+            variable=self.compare_var,
+            command=self.render,
+            font=("Segoe UI", 9),
+            fg=self.colors['text'],
+            bg=self.colors['card'],
+            selectcolor=self.colors['input_bg'],
+            activebackground=self.colors['card'],
+            activeforeground=self.colors['text']
+        )
+        compare_check.grid(row=0, column=4, padx=(8, 0))
+        
+        self.canvas.bind('<Configure>', self.on_canvas_resize)
+        self.canvas.bind('<ButtonPress-1>', self.on_drag_start)
+        self.canvas.bind('<B1-Motion>', self.on_drag)
+        self.canvas.bind('<ButtonRelease-1>', self.on_drag_end)
+        self.canvas.bind('<Double-Button-1>', lambda e: self.fit())
+        self.canvas.bind('<MouseWheel>', lambda e: self.zoom_at(
+            PREVIEW_ZOOM_STEP if e.delta > 0 else 1 / PREVIEW_ZOOM_STEP, e.x, e.y
+        ))
+        self.canvas.bind('<Button-4>', lambda e: self.zoom_at(PREVIEW_ZOOM_STEP, e.x, e.y))
+        self.canvas.bind('<Button-5>', lambda e: self.zoom_at(1 / PREVIEW_ZOOM_STEP, e.x, e.y))
+    
+    @property
+    def view_size(self) -> Tuple[int, int]:
+        """Size of the canvas in screen pixels."""
+        return self.canvas.winfo_width(), self.canvas.winfo_height()
+    
+    def set_image(self, image: Image.Image) -> None:
+        """Show an image, keeping the view if it is the image already shown.
+        
+        Args:
+            image: The image to preview
+        """
+        if self.pyramid is not None and self.pyramid.image is image:
+            self.render()
+            return
+        self.pyramid = TilePyramid(image)
+        self.fit()
+    
+    def refresh_comparison(self) -> None:
+        """Redraw after the encoder settings changed, if comparing."""
+        if self.compare_var.get():
+            self.render()
+    
+    def fit_zoom(self) -> float:
+        """Get the zoom that fits the whole image in the view, never enlarging."""
+        width, height = self.view_size
+        image_width, image_height = self.pyramid.size
+        return min(1.0, width / image_width, height / image_height)
+    
+    def fit(self) -> None:
+        """Show the whole image."""
+        if self.pyramid is None:
+            return
+        self.fit_mode = True
+        self.zoom = self.fit_zoom()
+        self.center = (self.pyramid.size[0] / 2, self.pyramid.size[1] / 2)
+        self.render()
+    
+    def actual_size(self) -> None:
+        """Show the image at 100%, keeping the view centered on the same point."""
+        width, height = self.view_size
+        self.zoom_at(1.0 / self.zoom, width / 2, height / 2)
+    
+    def zoom_at(self, factor: float, x: float, y: float) -> None:
+        """Zoom by a factor, keeping the image point under the cursor in place.
+        
+        Args:
+            factor: Zoom multiplier
+            x: Cursor x in the view
+            y: Cursor y in the view
+        """
+        if self.pyramid is None:
+            return
+        width, height = self.view_size
+        point_x = self.center[0] + (x - width / 2) / self.zoom
+        point_y = self.center[1] + (y - height / 2) / self.zoom
+        self.zoom = max(self.fit_zoom(), min(PREVIEW_MAX_ZOOM, self.zoom * factor))
+        self.center = (
+            point_x - (x - width / 2) / self.zoom,
+            point_y - (y - height / 2) / self.zoom
+        )
+        self.fit_mode = False
+        self._clamp_center()
+        self.render(interactive=True)
+    
+    def on_canvas_resize(self, event: tk.Event) -> None:
+        """Refit or redraw when the canvas changes size.
+        
+        Args:
+            event: The configure event
+        """
+        if self.fit_mode:
+            self.fit()
+        else:
+            self.render()
+    
+    def on_drag_start(self, event: tk.Event) -> None:
+        """Start panning.
+        
+        Args:
+            event: The button press event
+        """
+        self._drag_origin = (event.x, event.y)
+    
+    def on_drag(self, event: tk.Event) -> None:
+        """Pan the view with the mouse.
+        
+        Args:
+            event: The motion event
+        """
+        if self._drag_origin is None or self.pyramid is None:
+            return
+        dx = event.x - self._drag_origin[0]
+        dy = event.y - self._drag_origin[1]
+        self._drag_origin = (event.x, event.y)
+        self.center = (self.center[0] - dx / self.zoom, self.center[1] - dy / self.zoom)
+        self._clamp_center()
+        self.render(interactive=True)
+    
+    def on_drag_end(self, event: tk.Event) -> None:
+        """Stop panning and show the comparison for the new view right away.
+        
+        Args:
+            event: The button release event
+        """
+        self._drag_origin = None
+        if self._refine_job is not None:
+            self.render()
+    
+    def render(self, interactive: bool = False) -> None:
+        """Redraw the visible region, low-res first if its tiles are not built yet.
+        
+        Args:
+            interactive: The view is being panned or zoomed; in compare mode
+                the region is only encoded once the view rests
+        """
+        if self._refine_job is not None:
+            self.after_cancel(self._refine_job)
+            self._refine_job = None
+        width, height = self.view_size
+        if self.pyramid is None or width < 2 or height < 2:
+            return
+        
+        box, position, size = visible_region(self.pyramid.size, self.center, self.zoom, (width, height))
+        level = self.pyramid.level_for_zoom(self.zoom)
+        if interactive and self.compare_var.get():
+            ready = self.pyramid.is_ready(box, level)
+            draw_level = level if ready else max(level, self.pyramid.overview_level)
+            self._draw(box, position, size, draw_level, final=False)
+            self._refine_job = self.after(
+                PREVIEW_COMPARE_DELAY_MS,
+                lambda: self._refine(box, position, size, level)
+            )
+        elif self.pyramid.is_ready(box, level):
+            self._draw(box, position, size, level, final=True)
+        else:
+            self._draw(box, position, size, max(level, self.pyramid.overview_level), final=False)
+            self._refine_job = self.after(
+                PREVIEW_REFINE_DELAY_MS,
+                lambda: self._refine(box, position, size, level)
+            )
+        self.zoom_var.set(f"{self.zoom * 100:.0f}%")
+    
+    def _refine(self, box: Box, position: Tuple[int, int], size: Tuple[int, int], level: int) -> None:
+        """Replace the low-res pass with the full-quality one."""
+        self._refine_job = None
+        self._draw(box, position, size, level, final=True)
+    
+    def _draw(
+        self,
+        box: Box,
+        position: Tuple[int, int],
+        size: Tuple[int, int],
+        level: int,
+        final: bool
+    ) -> None:
+        """Render one pass and show it on the canvas.
+        
+        Args:
+            box: Visible region in image pixels
+            position: Where the region goes in the view
+            size: Size of the region in screen pixels
+            level: Pyramid level to render from
+            final: Whether this is the full-quality pass (the comparison is
+                only computed then)
+        """
+        image = self.pyramid.render(box, size, level)
+        if image.mode != "RGBA":
+            image = image.convert("RGB")
+        
+        split = None
+        hint = None
+        if self.compare_var.get():
+            region = (
+                int(box[0]),
+                int(box[1]),
+                int(math.ceil(box[2])),
+                int(math.ceil(box[3]))
+            )
+            area = (region[2] - region[0]) * (region[3] - region[1])
+            if area > PREVIEW_COMPARE_MAX_PIXELS:
+                hint = "Zoom in to compare"
+            elif final:
+                encoded = self.compare_provider(region)
+                if encoded is None:
+                    hint = "Comparison unavailable"
+                else:
+                    split = size[0] // 2
+                    resample = Image.Resampling.NEAREST if self.zoom >= 2 else Image.Resampling.BILINEAR
+                    encoded = encoded.resize(
+                        size,
+                        resample,
+                        box=(box[0] - region[0], box[1] - region[1], box[2] - region[0], box[3] - region[1])
+                    ).convert(image.mode)
+                    image.paste(encoded.crop((split, 0) + size), (split, 0))
+        
+        if image.mode == "RGBA":
+            background = Image.new("RGB", size, self.colors['input_bg'])
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        
+        self._photo = ImageTk.PhotoImage(image)
+        self.canvas.delete('all')
+        self.canvas.create_image(position, image=self._photo, anchor='nw')
+        if split is not None:
+            x = position[0] + split
+            self.canvas.create_line(x, position[1], x, position[1] + size[1], fill=self.colors['text'])
+            for text, anchor, offset in (("Original", 'ne', -6), ("Encoded", 'nw', 6)):
+                self.canvas.create_text(
+                    x + offset,
+                    position[1] + 6,
+                    text=text,
+                    anchor=anchor,
+                    fill=self.colors['text'],
+                    font=("Segoe UI", 9, "bold")
+                )
+        if hint is not None:
+            self.canvas.create_text(
+                self.view_size[0] // 2,
+                8,
+                text=hint,
+                anchor='n',
+                fill=self.colors['text_light'],
+                font=("Segoe UI", 9)
+            )
+    
+    def _clamp_center(self) -> None:
+        """Keep the view center inside the image."""
+        width, height = self.pyramid.size
+        self.center = (
+            max(0.0, min(float(width), self.center[0])),
+            max(0.0, min(float(height), self.center[1]))
+        )
@@ -0,0 +1,133 @@
+"""Virtualized list view for long conversion queues."""
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+from typing import Callable, Dict
+
+from ..constants import QUEUE_VIEW_ROWS
+
+
+class VirtualListView(tk.Frame):
+    """List view that only creates rows for the visible part of the data.
+    
+    A single Listbox holds just the rows that fit on screen; scrolling
+    refills those rows from ``row_text`` and the scrollbar is driven from the
+    row count, so showing 500,000 entries costs the same as showing 20.
+    """
+    
+    def __init__(
+        self,
+        parent: tk.Widget,
+        row_count: Callable[[], int],
+        row_text: Callable[[int], str],
+        colors: Dict[str, str],
+        rows: int = QUEUE_VIEW_ROWS
+    ) -> None:
+        """Create the view.
+        
+        Args:
+            parent: Parent widget
+            row_count: Returns the current number of rows
+            row_text: Returns the text of the row at an index
+            colors: Color scheme dictionary
+            rows: Number of rows shown before the first resize
+        """
+        super().__init__(parent, bg=colors['card'])
+        self.row_count = row_count
+        self.row_text = row_text
+        self.first = 0
+        self.rows = rows
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self.listbox = tk.Listbox(
+            self,
+            height=rows,
+            font=("Consolas", 9),
+            bg=colors['input_bg'],
+            fg=colors['text'],
+            selectbackground=colors['primary'],
+            relief='flat',
+            bd=0,
+            highlightthickness=0,
+            activestyle='none'
+        )
+        self.listbox.grid(row=0, column=0, sticky='nsew')
+        
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        
+        self.listbox.bind('<Configure>', self.on_resize)
+        self.listbox.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll_to(self.first - 3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll_to(self.first + 3))
+        self.listbox.bind('<Up>', lambda e: self.scroll_to(self.first - 1))
+        self.listbox.bind('<Down>', lambda e: self.scroll_to(self.first + 1))
+        self.listbox.bind('<Prior>', lambda e: self.scroll_to(self.first - self.rows))
+        self.listbox.bind('<Next>', lambda e: self.scroll_to(self.first + self.rows))
+    
+    def refresh(self) -> None:
+        """Redraw the visible rows from the data."""
+        count = self.row_count()
+        self.first = max(0, min(self.first, count - self.rows))
+        last = min(count, self.first + self.rows)
+        
+        self.listbox.delete(0, 'end')
+        for index in range(self.first, last):
+            self.listbox.insert('end', self.row_text(index))
+        
+        if count:
+            self.scrollbar.set(self.first / count, last / count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def scroll_to(self, first: int) -> str:
+        """Show the rows starting at an index.
+        
+        Args:
+            first: Index of the first visible row
+        
+        Returns:
+            ``"break"`` so Tk does not scroll the Listbox itself.
+        """
+        self.first = first
+        self.refresh()
+        return "break"
+    
+    def on_scroll(self, action: str, *args: str) -> None:
+        """Handle scrollbar commands.
+        
+        Args:
+            action: ``"moveto"`` or ``"scroll"``
+            args: The fraction, or the step count and unit
+        """
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * self.row_count()))
+        elif action == 'scroll':
+            step = self.rows if args[1] == 'pages' else 1
+            self.scroll_to(self.first + int(args[0]) * step)
+    
+    def on_mouse_wheel(self, event: tk.Event) -> str:
+        """Scroll three rows per wheel notch.
+        
+        Args:
+            event: The mouse wheel event
+        
+        Returns:
+            ``"break"`` so Tk does not scroll the Listbox itself.
+        """
+        return self.scroll_to(self.first - 3 * (1 if event.delta > 0 else -1))
+    
+    def on_resize(self, event: tk.Event) -> None:
+        """Show as many rows as fit the new height.
+        
+        Args:
+            event: The configure event
+        """
+        line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace')
+        rows = max(1, event.height // max(1, line_height))
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
+
@@ -0,0 +1,39 @@
+"""Regression tests for automatic quality selection."""
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from image_converter.core.metrics import luma_array, ssim
+from image_converter.core.quality import find_auto_quality
+
+
+def _worst_block_ssim(original: Image.Image, encoded: Image.Image, block: int = 256) -> float:
+    """Lowest full-resolution SSIM over every block of the image."""
+    size = max(original.size)
+    reference = luma_array(original, size)
+    distorted = luma_array(encoded, size)
+    return min(
+        ssim(reference[top:top + block, left:left + block], distorted[top:top + block, left:left + block])
+        for top in range(0, original.height, block)
+        for left in range(0, original.width, block)
+    )
+
+
+@pytest.mark.parametrize("format_name", ["JPEG", "WEBP"])
+def test_off_grid_text_reaches_target(format_name):
+    """Text away from any fixed sampling grid still has to reach the target."""
+    image = Image.new("RGB", (3000, 2000), (200, 210, 220))
+    draw = ImageDraw.Draw(image)
+    for top in range(500, 860, 12):
+        draw.text((1300, top), "The quick brown fox jumps over the lazy dog 0123", fill=(20, 20, 20))
+    
+    result = find_auto_quality(image, format_name)
+    buffer = io.BytesIO()
+    image.save(buffer, format_name, quality=result.quality)
+    buffer.seek(0)
+    with Image.open(buffer) as encoded:
+        worst = _worst_block_ssim(image, encoded)
+    
+    assert result.met_target
+    assert worst >= result.target - 0.01